@@ -9,7 +9,7 @@ import asyncio
 from src.domain.entities.camera import Camera
 from src.domain.usecases.camera_management import CameraManagementUseCase
 from src.domain.usecases.camera_status import CameraStatusUseCase
-from src.core.errors.exceptions import ValidationError, CameraError
+from src.core.errors.exceptions import ValidationError, CameraError, CameraNotFoundError
 from src.core.utils.validation import is_valid_camera_id, validate_required_fields
 
 
@@ -152,27 +152,32 @@ class CameraController(BaseHTTPRequestHandler):
             else:
                 self.send_error_response(404, message)
                 
+        except CameraNotFoundError as e:
+            self.send_error_response(404, str(e))
         except CameraError as e:
             self.send_error_response(400, str(e))
     
     def _handle_status(self):
         """Handle general status requests."""
         try:
-            cameras = asyncio.run(self.camera_status_usecase.list_all_cameras())
-            
-            camera_list = [
-                {
+            cameras = asyncio.run(self.camera_status_usecase.list_cameras_with_status())
+            
+            # Build the camera list and active count in a single pass
+            active_count = 0
+            camera_list = []
+            for camera in cameras:
+                if camera.get("is_active", True):
+                    active_count += 1
+                camera_list.append({
                     "camera_id": camera["camera_id"],
                     "rtsp_url": camera["rtsp_url"],
-                }
-                for camera in cameras
-            ]
+                })
             
             self.send_json_response(200, {
                 "success": True,
                 "api_status": "running",
-                "active_cameras": len([c for c in cameras if c.get("is_active", True)]),
-                "total_cameras": len(cameras),
+                "active_cameras": active_count,
+                "total_cameras": len(camera_list),
                 "cameras": camera_list
             })
             
@@ -6,13 +6,45 @@ import json
 import threading
 import logging
 import time
-from typing import Set, Optional, Dict, Any
+from typing import Set, Optional, Dict, Any, List, Union
 from src.domain.entities.motion_event import MotionEvent
-from src.core.utils.datetime_utils import utc_now
+from src.core.utils.datetime_utils import utc_now, utc_now_iso_cached
+from src.core.utils.string_utils import fast_json_dumps, fast_json_loads
 from src.core.config.settings import WebSocketConfig
 
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import uvloop
+except ImportError:  # optional dependency (not available on Windows)
+    uvloop = None
+
 logger = logging.getLogger(__name__)
 
+# Clients with more than this many bytes still unsent miss broadcasts until they catch up
+BROADCAST_MAX_BUFFERED = 1 << 16
+
+# Serialized welcome frame; only the timestamp and server_info values vary per connection
+_WELCOME_TEMPLATE = (
+    '{"type":"connection","message":"Connected to Motion Detection WebSocket Server",'
+    '"timestamp":"%s","format":"%s","server_info":{"active_clients":%d,"server_uptime":%r}}'
+)
+
+# Serialized pong frame; filled with the timestamp and the three server_stats counters
+_PONG_TEMPLATE = (
+    '{"type":"pong","timestamp":"%s","server_stats":{"active_clients":%d,'
+    '"total_messages_sent":%d,"total_messages_received":%d}}'
+)
+
+# Exact keepalive payloads from common clients (JSON.stringify / json.dumps); these
+# are answered without running the JSON parser
+_PING_MESSAGES = frozenset(
+    form for text in ('{"type":"ping"}', '{"type": "ping"}') for form in (text, text.encode())
+)
+
 
 class WebSocketGateway:
     """WebSocket gateway for real-time motion detection updates."""
@@ -30,6 +62,15 @@ class WebSocketGateway:
         self._total_messages_sent = 0
         self._total_messages_received = 0
         
+        # Motion events may be sent as MessagePack binary frames; everything else stays JSON
+        self.event_format = websocket_config.event_format
+        if self.event_format == 'msgpack' and msgpack is None:
+            logger.warning("WEBSOCKET_EVENT_FORMAT=msgpack but msgpack is not installed; using json")
+            self.event_format = 'json'
+        elif self.event_format not in ('json', 'msgpack'):
+            logger.warning(f"Unknown WebSocket event format {self.event_format!r}; using json")
+            self.event_format = 'json'
+        
         logger.info(f"WebSocket gateway initialized - Host: {self.host}, Port: {self.port}")
     
     async def register_client(self, websocket: websockets.WebSocketServerProtocol):
@@ -38,63 +79,46 @@ class WebSocketGateway:
         self.clients.add(websocket)
         self._total_connections += 1
         
-        try:
-            remote_address = websocket.remote_address
-            if remote_address:
-                client_info = f"{remote_address[0]}:{remote_address[1]}"
-            else:
-                client_info = "unknown"
-        except Exception as e:
-            logger.warning(f"Failed to get client remote address: {e}")
-            client_info = "unknown"
+        # remote_address is a plain attribute (None once the transport is gone)
+        remote_address = websocket.remote_address
+        client_info = f"{remote_address[0]}:{remote_address[1]}" if remote_address else "unknown"
+        message_count = 0
         
         logger.info(f"WebSocket client connected from {client_info}. "
                    f"Active clients: {len(self.clients)}, Total connections: {self._total_connections}")
         
         try:
             # Send welcome message with connection details
-            welcome_message = {
-                "type": "connection",
-                "message": "Connected to Motion Detection WebSocket Server",
-                "timestamp": utc_now().isoformat(),
-                "server_info": {
-                    "active_clients": len(self.clients),
-                    "server_uptime": time.time() - self._start_time if self._start_time else 0
-                }
-            }
-            await websocket.send(json.dumps(welcome_message))
+            uptime = time.time() - self._start_time if self._start_time else 0.0
+            await websocket.send(_WELCOME_TEMPLATE % (utc_now_iso_cached(), self.event_format,
+                                                      len(self.clients), uptime))
             self._total_messages_sent += 1
             
-            logger.debug(f"Sent welcome message to client {client_info}")
+            logger.debug("Sent welcome message to client %s", client_info)
             
             # Handle incoming messages with improved logging
-            message_count = 0
             async for message in websocket:
                 message_count += 1
                 self._total_messages_received += 1
                 
                 try:
-                    data = json.loads(message)
-                    message_type = data.get("type", "unknown")
+                    if message in _PING_MESSAGES:
+                        message_type = "ping"
+                    else:
+                        message_type = fast_json_loads(message).get("type", "unknown")
                     
-                    logger.debug(f"Received message from {client_info}: type={message_type}, "
-                               f"client_message_count={message_count}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"Received message from {client_info}: type={message_type}, "
+                                   f"client_message_count={message_count}")
                     
                     if message_type == "ping":
-                        pong_response = {
-                            "type": "pong",
-                            "timestamp": utc_now().isoformat(),
-                            "server_stats": {
-                                "active_clients": len(self.clients),
-                                "total_messages_sent": self._total_messages_sent,
-                                "total_messages_received": self._total_messages_received
-                            }
-                        }
-                        await websocket.send(json.dumps(pong_response))
+                        await websocket.send(_PONG_TEMPLATE % (
+                            utc_now_iso_cached(), len(self.clients),
+                            self._total_messages_sent, self._total_messages_received))
                         self._total_messages_sent += 1
-                        logger.debug(f"Sent pong response to {client_info}")
+                        logger.debug("Sent pong response to %s", client_info)
                     else:
-                        logger.debug(f"Received non-ping message from {client_info}: {message_type}")
+                        logger.debug("Received non-ping message from %s: %s", client_info, message_type)
                         
                 except json.JSONDecodeError as e:
                     logger.warning(f"Invalid JSON received from {client_info}: {str(e)[:100]}...")
@@ -128,35 +152,47 @@ class WebSocketGateway:
             logger.debug("No clients connected, skipping broadcast")
             return
         
-        start_time = time.time()
-        message_str = json.dumps(message)
-        message_size = len(message_str.encode('utf-8'))
-        disconnected_clients = set()
-        successful_sends = 0
+        await self.broadcast_raw(fast_json_dumps(message), message.get('type', 'unknown'))
+    
+    async def broadcast_raw(self, message_str: Union[str, bytes], message_type: str = "raw"):
+        """
+        Broadcast an already-serialized payload to all connected clients.
         
-        logger.debug(f"Broadcasting message to {len(self.clients)} clients. "
-                    f"Message size: {message_size} bytes, Type: {message.get('type', 'unknown')}")
+        Args:
+            message_str: Serialized message, sent as-is to every client; str is
+                sent as a text frame, bytes as a binary frame
+            message_type: Message type used for logging only
+        """
+        if not self.clients:
+            logger.debug("No clients connected, skipping broadcast")
+            return
         
-        for client in self.clients.copy():
-            try:
-                await client.send(message_str)
-                successful_sends += 1
-                self._total_messages_sent += 1
-            except websockets.exceptions.ConnectionClosed:
-                logger.debug("Client connection closed during broadcast")
-                disconnected_clients.add(client)
-            except Exception as e:
-                logger.error(f"Error sending message to client: {e}")
-                disconnected_clients.add(client)
+        start_time = time.time()
+        logger.debug("Broadcasting message to %d clients. Type: %s", len(self.clients), message_type)
         
-        # Remove disconnected clients
-        for client in disconnected_clients:
-            await self.unregister_client(client)
+        # websockets.broadcast frames the payload once and writes it to every open
+        # connection synchronously, with no per-client send() coroutine. Connections
+        # that fail the write are logged by websockets and unregister themselves
+        # when their handler exits. broadcast() ignores backpressure, so a client that
+        # is not draining its socket skips frames here instead of buffering without bound.
+        open_clients = []
+        backlogged = 0
+        for client in self.clients:
+            if not client.open:
+                continue
+            if client.transport.get_write_buffer_size() > BROADCAST_MAX_BUFFERED:
+                backlogged += 1
+                continue
+            open_clients.append(client)
+        websockets.broadcast(open_clients, message_str)
+        self._total_messages_sent += len(open_clients)
         
-        broadcast_duration = time.time() - start_time
-        logger.info(f"Broadcast completed - Successful: {successful_sends}/{len(self.clients) + len(disconnected_clients)}, "
-                   f"Disconnected: {len(disconnected_clients)}, Duration: {broadcast_duration:.3f}s, "
-                   f"Message size: {message_size} bytes")
+        if logger.isEnabledFor(logging.INFO):
+            message_size = len(message_str.encode('utf-8') if isinstance(message_str, str) else message_str)
+            logger.info("Broadcast completed - Sent: %d/%d, Skipped backlogged: %d, "
+                        "Duration: %.3fs, Message size: %d bytes",
+                        len(open_clients), len(self.clients), backlogged,
+                        time.time() - start_time, message_size)
     
     async def start_server(self):
         """Start the WebSocket server."""
@@ -170,7 +206,10 @@ class WebSocketGateway:
                 self.host,
                 self.port,
                 ping_interval=30,
-                ping_timeout=10
+                ping_timeout=10,
+                # Frames are small motion/pong messages; permessage-deflate would cost a
+                # zlib pass (and a compressor context per client) for little bandwidth
+                compression=None
             )
             
             self._running = True
@@ -256,7 +295,8 @@ class WebSocketGateway:
             thread_name = threading.current_thread().name
             logger.info(f"WebSocket server thread '{thread_name}' starting...")
             
-            self.loop = asyncio.new_event_loop()
+            # libuv-based loop when available; websockets runs on it unchanged
+            self.loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
             
             try:
@@ -320,7 +360,7 @@ class WebSocketGateway:
     def get_client_count(self) -> int:
         """Get the number of connected clients."""
         count = len(self.clients)
-        logger.debug(f"Current WebSocket client count: {count}")
+        logger.debug("Current WebSocket client count: %d", count)
         return count
     
     def get_server_stats(self) -> Dict[str, Any]:
@@ -352,27 +392,69 @@ class WebSocketGateway:
             motion_event: The motion event to broadcast
         """
         if not self.clients:
-            logger.warning(f"No WebSocket clients connected to broadcast motion event for camera {motion_event.camera_id}")
+            logger.warning("No WebSocket clients connected to broadcast motion event for camera %s",
+                           motion_event.camera_id)
             return
-            
+        
         motion_type = "started" if motion_event.motion_detected else "stopped"
-        logger.info(f"Broadcasting motion {motion_type} event for camera {motion_event.camera_id} to {len(self.clients)} clients")
+        logger.info("Broadcasting motion %s event for camera %s to %d clients",
+                    motion_type, motion_event.camera_id, len(self.clients))
         
-        message = {
-            "type": "motion_event",
-            "camera_id": motion_event.camera_id,
-            "motion_detected": motion_event.motion_detected,
-            "timestamp": motion_event.timestamp.isoformat(),
-            "video_path": motion_event.video_path
-        }
+        # Serialize once; the same payload is fanned out to every client
+        payload = self._encode_event(self._motion_event_message(motion_event))
         
         # Add extra context for debugging
         if motion_event.video_path:
-            logger.debug(f"Motion event includes video path: {motion_event.video_path}")
+            logger.debug("Motion event includes video path: %s", motion_event.video_path)
         
         start_time = time.time()
-        await self._broadcast_to_clients(message)
-        broadcast_duration = time.time() - start_time
+        await self.broadcast_raw(payload, "motion_event")
         
-        logger.info(f"Motion {motion_type} event broadcast completed for camera {motion_event.camera_id}. "
-                   f"Duration: {broadcast_duration:.3f}s")
\ No newline at end of file
+        logger.info("Motion %s event broadcast completed for camera %s. Duration: %.3fs",
+                    motion_type, motion_event.camera_id, time.time() - start_time)
+    
+    async def broadcast_motion_events(self, motion_events: List[MotionEvent]):
+        """
+        Broadcast several motion events to all clients as a single frame.
+        
+        A single event is sent as a regular "motion_event" message; two or
+        more are wrapped as {"type": "motion_batch", "events": [...]}, where
+        each entry has the same shape as a "motion_event" message.
+        
+        Args:
+            motion_events: The motion events to broadcast, in order
+        """
+        if not self.clients:
+            logger.warning("No WebSocket clients connected to broadcast %d motion events", len(motion_events))
+            return
+        
+        events = motion_events
+        if not events:
+            return
+        
+        if len(events) == 1:
+            payload = self._encode_event(self._motion_event_message(events[0]))
+            message_type = "motion_event"
+        else:
+            payload = self._encode_event({
+                "type": "motion_batch",
+                "events": [self._motion_event_message(event) for event in events]
+            })
+            message_type = "motion_batch"
+        
+        start_time = time.time()
+        await self.broadcast_raw(payload, message_type)
+        
+        logger.info("Motion broadcast of %d events completed. Duration: %.3fs",
+                    len(events), time.time() - start_time)
+    
+    def _encode_event(self, message: Dict[str, Any]) -> Union[str, bytes]:
+        """Serialize a motion event message in the configured event format."""
+        if self.event_format == 'msgpack':
+            return msgpack.packb(message, use_bin_type=True)
+        return fast_json_dumps(message)
+    
+    @staticmethod
+    def _motion_event_message(motion_event: MotionEvent) -> Dict[str, Any]:
+        """Build the wire message for a single motion event."""
+        return {"type": "motion_event", **motion_event.to_payload()}
@@ -23,6 +23,7 @@ class WebSocketConfig:
     """WebSocket server configuration"""
     host: str = '0.0.0.0'
     port: int = 8084
+    event_format: str = 'json'  # 'json' (text frames) or 'msgpack' (binary frames)
 
 
 @dataclass
@@ -31,6 +32,7 @@ class CameraConfig:
     default_width: int = 1280
     default_height: int = 720
     default_fps: int = 15
+    capture_backend: str = 'ffmpeg'
 
 
 @dataclass
@@ -47,6 +49,9 @@ class MotionDetectionConfig:
     skip_frames: int = 10
     post_buffer_seconds: int = 3
     fps: int = 15
+    broadcast_debounce_seconds: float = 0.5
+    scale: float = 0.25
+    max_idle_skip_factor: int = 2  # Cap on the idle frame-skip backoff (1 disables it)
 
 
 @dataclass
@@ -61,6 +66,7 @@ class RecordingConfig:
     ffmpeg_resolution: str = "1280x720"
     ffmpeg_audio_bitrate: str = "64k"
     ffmpeg_threads: int = 2
+    ffmpeg_cpus: str = ""  # Linux CPU list like "4-7" or "0,2"; empty = all CPUs
 
 
 @dataclass
@@ -71,6 +77,7 @@ class PerformanceConfig:
     init_frame_wait: float = 0.2
     adaptive_sleep_no_motion: float = 0.05
     adaptive_sleep_motion: float = 0.03
+    pin_camera_threads: bool = False
 
 
 @dataclass
@@ -100,13 +107,15 @@ class ApplicationSettings:
         
         websocket = WebSocketConfig(
             host=os.getenv('WEBSOCKET_HOST', '0.0.0.0'),
-            port=int(os.getenv('WEBSOCKET_PORT', '8084'))
+            port=int(os.getenv('WEBSOCKET_PORT', '8084')),
+            event_format=os.getenv('WEBSOCKET_EVENT_FORMAT', 'json').lower()
         )
         
         camera = CameraConfig(
             default_width=int(os.getenv('CAMERA_DEFAULT_WIDTH', '1280')),
             default_height=int(os.getenv('CAMERA_DEFAULT_HEIGHT', '720')),
-            default_fps=int(os.getenv('CAMERA_DEFAULT_FPS', '15'))
+            default_fps=int(os.getenv('CAMERA_DEFAULT_FPS', '15')),
+            capture_backend=os.getenv('CAPTURE_BACKEND', 'ffmpeg')
         )
         
         server = ServerConfig(
@@ -118,7 +127,10 @@ class ApplicationSettings:
             min_area=int(os.getenv('MOTION_MIN_AREA', '800')),
             skip_frames=int(os.getenv('MOTION_SKIP_FRAMES', '10')),
             post_buffer_seconds=int(os.getenv('MOTION_POST_BUFFER', '3')),
-            fps=int(os.getenv('MOTION_FPS', '15'))
+            fps=int(os.getenv('MOTION_FPS', '15')),
+            broadcast_debounce_seconds=float(os.getenv('MOTION_BROADCAST_DEBOUNCE', '0.5')),
+            scale=float(os.getenv('MOTION_SCALE', '0.25')),
+            max_idle_skip_factor=int(os.getenv('MOTION_MAX_IDLE_SKIP_FACTOR', '2'))
         )
         
         recording = RecordingConfig(
@@ -130,7 +142,8 @@ class ApplicationSettings:
             ffmpeg_fps=int(os.getenv('FFMPEG_FPS', '15')),
             ffmpeg_resolution=os.getenv('FFMPEG_RESOLUTION', '1280x720'),
             ffmpeg_audio_bitrate=os.getenv('FFMPEG_AUDIO_BITRATE', '64k'),
-            ffmpeg_threads=int(os.getenv('FFMPEG_THREADS', '2'))
+            ffmpeg_threads=int(os.getenv('FFMPEG_THREADS', '2')),
+            ffmpeg_cpus=os.getenv('FFMPEG_CPUS', '')
         )
         
         performance = PerformanceConfig(
@@ -138,7 +151,8 @@ class ApplicationSettings:
             max_init_frames=int(os.getenv('MAX_INIT_FRAMES', '50')),
             init_frame_wait=float(os.getenv('INIT_FRAME_WAIT', '0.2')),
             adaptive_sleep_no_motion=float(os.getenv('ADAPTIVE_SLEEP_NO_MOTION', '0.05')),
-            adaptive_sleep_motion=float(os.getenv('ADAPTIVE_SLEEP_MOTION', '0.03'))
+            adaptive_sleep_motion=float(os.getenv('ADAPTIVE_SLEEP_MOTION', '0.03')),
+            pin_camera_threads=os.getenv('PIN_CAMERA_THREADS', 'false').lower() in ('1', 'true', 'yes')
         )
         
         log_file = os.getenv('LOG_FILE')
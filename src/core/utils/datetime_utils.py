@@ -10,6 +10,41 @@ def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+# (monotonic time, UTC datetime) of the last utc_now_cached() refresh
+_cached_now = (float('-inf'), None)
+_CACHED_NOW_MAX_AGE = 0.01
+
+
+def utc_now_cached() -> datetime:
+    """Get current UTC datetime, reusing a value up to 10ms old.
+    
+    For hot paths where millisecond precision is ample; use utc_now() when an
+    exact timestamp matters.
+    """
+    global _cached_now
+    mono = time.monotonic()
+    cached_mono, cached_dt = _cached_now
+    if mono - cached_mono > _CACHED_NOW_MAX_AGE:
+        cached_dt = datetime.now(timezone.utc)
+        _cached_now = (mono, cached_dt)
+    return cached_dt
+
+
+# (datetime, isoformat string) last produced by utc_now_iso_cached()
+_cached_iso = (None, "")
+
+
+def utc_now_iso_cached() -> str:
+    """Get utc_now_cached() as an ISO 8601 string, formatting each cached value once."""
+    global _cached_iso
+    now = utc_now_cached()
+    cached_dt, cached_str = _cached_iso
+    if now is not cached_dt:
+        cached_str = now.isoformat()
+        _cached_iso = (now, cached_str)
+    return cached_str
+
+
 def timestamp_to_datetime(timestamp: float) -> datetime:
     """Convert Unix timestamp to UTC datetime."""
     return datetime.fromtimestamp(timestamp, tz=timezone.utc)
@@ -1,12 +1,19 @@
 """File system utility functions."""
 
+import fnmatch
 import os
 import shutil
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Generator, Union
 import tempfile
 import hashlib
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 
 def ensure_directory_exists(path: Union[str, Path]) -> Path:
     """Ensure directory exists, create if it doesn't."""
@@ -18,9 +25,11 @@ def ensure_directory_exists(path: Union[str, Path]) -> Path:
 def safe_remove_file(file_path: Union[str, Path]) -> bool:
     """Safely remove file, return True if successful."""
     try:
-        Path(file_path).unlink(missing_ok=True)
+        os.unlink(file_path)
         return True
-    except Exception:
+    except FileNotFoundError:
+        return True
+    except OSError:
         return False
 
 
@@ -36,19 +45,17 @@ def safe_remove_directory(dir_path: Union[str, Path]) -> bool:
 def get_file_size(file_path: Union[str, Path]) -> int:
     """Get file size in bytes, return 0 if file doesn't exist."""
     try:
-        return Path(file_path).stat().st_size
-    except (OSError, FileNotFoundError):
+        return os.stat(file_path).st_size
+    except OSError:
         return 0
 
 
 def get_file_hash(file_path: Union[str, Path], algorithm: str = 'md5') -> Optional[str]:
     """Calculate file hash using specified algorithm."""
     try:
-        hash_obj = hashlib.new(algorithm)
         with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_obj.update(chunk)
-        return hash_obj.hexdigest()
+            # file_digest reads into a reusable buffer and releases the GIL
+            return hashlib.file_digest(f, algorithm).hexdigest()
     except Exception:
         return None
 
@@ -56,21 +63,33 @@ def get_file_hash(file_path: Union[str, Path], algorithm: str = 'md5') -> Option
 def copy_file_safe(src: Union[str, Path], dst: Union[str, Path]) -> bool:
     """Safely copy file, creating destination directories if needed."""
     try:
-        src_path = Path(src)
-        dst_path = Path(dst)
-        
-        if not src_path.exists():
+        if not os.path.exists(src):
             return False
         
-        # Ensure destination directory exists
-        dst_path.parent.mkdir(parents=True, exist_ok=True)
+        # Ensure destination directory exists (cached across repeated copies)
+        parent_dir = os.path.dirname(os.fspath(dst))
+        if parent_dir:
+            _ensure_directory_cached(parent_dir)
         
-        shutil.copy2(src_path, dst_path)
+        try:
+            shutil.copy2(src, dst)
+        except FileNotFoundError:
+            # Directory was removed since it was cached (e.g. by cleanup)
+            _ensure_directory_cached.cache_clear()
+            if parent_dir:
+                os.makedirs(parent_dir, exist_ok=True)
+            shutil.copy2(src, dst)
         return True
     except Exception:
         return False
 
 
+@lru_cache(maxsize=1024)
+def _ensure_directory_cached(dir_path: str) -> None:
+    """Create a directory once per process; repeat calls are cache hits."""
+    os.makedirs(dir_path, exist_ok=True)
+
+
 def find_files(directory: Union[str, Path], 
                pattern: str = "*", 
                recursive: bool = True) -> Generator[Path, None, None]:
@@ -136,38 +155,66 @@ def get_directory_size(directory: Union[str, Path]) -> int:
 def cleanup_old_files(directory: Union[str, Path], 
                      max_age_days: int, 
                      pattern: str = "*") -> int:
-    """Remove files older than max_age_days, return count of removed files."""
+    """Remove files older than max_age_days, return count of removed files.
+    
+    Walks with os.scandir and compares raw st_mtime against a cutoff
+    timestamp, so each entry is stat'ed at most once.
+    """
     import time
     
     removed_count = 0
-    max_age_seconds = max_age_days * 24 * 60 * 60
-    current_time = time.time()
+    cutoff = time.time() - max_age_days * 24 * 60 * 60
+    stack = [os.fspath(directory)]
     
-    try:
-        for file_path in find_files(directory, pattern, recursive=True):
-            if file_path.is_file():
-                file_age = current_time - file_path.stat().st_mtime
-                if file_age > max_age_seconds:
-                    if safe_remove_file(file_path):
-                        removed_count += 1
-    except Exception:
-        pass
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif (entry.is_file() and fnmatch.fnmatchcase(entry.name, pattern)
+                              and entry.stat().st_mtime < cutoff):
+                            if safe_remove_file(entry.path):
+                                removed_count += 1
+                    except OSError:
+                        continue
+        except OSError:
+            continue
     
     return removed_count
 
 
 def is_file_locked(file_path: Union[str, Path]) -> bool:
     """Check if file is locked (being used by another process)."""
+    if fcntl is None:
+        try:
+            with open(file_path, 'a'):
+                return False
+        except (IOError, OSError):
+            return True
+    
+    # Probe with a non-blocking advisory lock; this leaves timestamps untouched
     try:
-        with open(file_path, 'a'):
-            return False
-    except (IOError, OSError):
+        fd = os.open(file_path, os.O_RDONLY)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return True
+    
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return False
+    except OSError:
         return True
+    finally:
+        os.close(fd)
 
 
 def get_file_extension(file_path: Union[str, Path]) -> str:
     """Get file extension (without the dot)."""
-    return Path(file_path).suffix.lstrip('.')
+    return os.path.splitext(file_path)[1].lstrip('.')
 
 
 def normalize_path(path: Union[str, Path]) -> Path:
@@ -0,0 +1,94 @@
+"""Ring-buffered stdout logger for per-frame worker threads."""
+
+import atexit
+import itertools
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+# Ring slots; older unread lines are overwritten when writers outpace the drain
+RING_LOG_CAPACITY = 1024
+RING_LOG_BATCH = 64
+RING_LOG_IDLE_SLEEP = 0.05
+
+
+class RingLog:
+    """Flight-recorder style log ring drained to stdout by one daemon thread.
+    
+    Writers never block on stdio: each line takes a sequence number from an
+    itertools.count (atomic under the GIL) and is stored as (seq, line) in
+    its slot. The drain thread writes lines in sequence order, in batches,
+    and skips ahead when a slot has already been overwritten.
+    """
+    
+    def __init__(self, capacity: int = RING_LOG_CAPACITY, stream=None):
+        self._capacity = capacity
+        self._ring: List[Optional[Tuple[int, str]]] = [None] * capacity
+        self._counter = itertools.count()
+        self._read_seq = 0
+        self._stream = stream
+        self._drain_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+    
+    def write(self, line: str) -> None:
+        """Queue a line for output without touching stdout."""
+        seq = next(self._counter)
+        self._ring[seq % self._capacity] = (seq, line)
+        if self._thread is None:
+            self._start()
+    
+    def _start(self) -> None:
+        """Start the drain thread on first use."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="RingLog", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+    
+    def _run(self) -> None:
+        """Drain loop: write batches, idle briefly when the ring is empty."""
+        while True:
+            if not self.flush(RING_LOG_BATCH):
+                time.sleep(RING_LOG_IDLE_SLEEP)
+    
+    def flush(self, limit: Optional[int] = None) -> int:
+        """Write pending lines to the stream.
+        
+        Args:
+            limit: Maximum number of lines to write, or None for all pending
+        
+        Returns:
+            Number of lines written
+        """
+        with self._drain_lock:
+            ring, capacity = self._ring, self._capacity
+            read_seq = self._read_seq
+            lines = []
+            while limit is None or len(lines) < limit:
+                slot = ring[read_seq % capacity]
+                if slot is None or slot[0] < read_seq:
+                    break  # Not written yet
+                if slot[0] > read_seq:
+                    # Overwritten before we got to it; resume at the oldest surviving line
+                    read_seq = max(read_seq, slot[0] - capacity + 1)
+                    continue
+                lines.append(slot[1])
+                read_seq += 1
+            self._read_seq = read_seq
+            
+            if lines:
+                stream = self._stream or sys.stdout
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+            return len(lines)
+
+
+ring_log = RingLog()
+
+
+def log_line(line: str) -> None:
+    """Queue a line on the shared ring log."""
+    ring_log.write(line)
@@ -1,9 +1,32 @@
 """String manipulation utility functions."""
 
 import re
+import string
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
 import json
 
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+_NUMBER_PATTERN = re.compile(r'-?\d+\.?\d*')
+_DASH_RUN_PATTERN = re.compile(r'-{2,}')
+
+
+class _SlugTable(dict):
+    """str.translate table: keeps [a-z0-9-], lowercases A-Z, whitespace -> '-'."""
+    
+    def __missing__(self, codepoint: int) -> Optional[str]:
+        value = '-' if chr(codepoint).isspace() else None
+        self[codepoint] = value
+        return value
+
+
+_SLUG_TABLE = _SlugTable({ord(c): c.lower() for c in string.ascii_letters + string.digits + '-'})
+
 
 def snake_to_camel(snake_str: str) -> str:
     """Convert snake_case to camelCase."""
@@ -46,9 +69,7 @@ def normalize_whitespace(text: str) -> str:
 
 def extract_numbers(text: str) -> List[float]:
     """Extract all numbers from text."""
-    pattern = r'-?\d+\.?\d*'
-    matches = re.findall(pattern, text)
-    return [float(match) for match in matches if match]
+    return list(map(float, _NUMBER_PATTERN.findall(text)))
 
 
 def format_bytes(bytes_value: int) -> str:
@@ -76,6 +97,24 @@ def safe_json_dumps(obj: Any, default: str = "{}") -> str:
         return default
 
 
+def fast_json_dumps(obj: Any) -> str:
+    """Serialize object to compact JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def fast_json_loads(data: Any) -> Any:
+    """Parse JSON text or bytes, using orjson when it is installed.
+    
+    Raises json.JSONDecodeError on invalid input either way (orjson's error
+    type subclasses it).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def mask_sensitive_data(text: str, patterns: Optional[List[str]] = None) -> str:
     """Mask sensitive data in text using regex patterns."""
     if patterns is None:
@@ -94,26 +133,34 @@ def mask_sensitive_data(text: str, patterns: Optional[List[str]] = None) -> str:
 
 def generate_slug(text: str, max_length: int = 50) -> str:
     """Generate URL-friendly slug from text."""
-    # Convert to lowercase and replace spaces/special chars with hyphens
-    slug = re.sub(r'[^a-zA-Z0-9\s-]', '', text.lower())
-    slug = re.sub(r'\s+', '-', slug.strip())
-    slug = re.sub(r'-+', '-', slug)
-    slug = slug.strip('-')
+    # Lowercase first (some non-ASCII letters lowercase to ASCII, e.g. U+212A -> 'k'),
+    # then drop special chars and map whitespace to hyphens in one pass
+    slug = text.lower().translate(_SLUG_TABLE)
+    slug = _DASH_RUN_PATTERN.sub('-', slug).strip('-')
     
     return truncate_string(slug, max_length, suffix="")
 
 
 def parse_key_value_pairs(text: str, delimiter: str = '=', separator: str = ',') -> Dict[str, str]:
     """Parse key=value pairs from text."""
-    result = {}
-    
     if not text.strip():
-        return result
+        return {}
     
-    pairs = text.split(separator)
-    for pair in pairs:
-        if delimiter in pair:
-            key, value = pair.split(delimiter, 1)
-            result[key.strip()] = value.strip()
+    if len(delimiter) != 1 or len(separator) != 1:
+        result = {}
+        for pair in text.split(separator):
+            if delimiter in pair:
+                key, value = pair.split(delimiter, 1)
+                result[key.strip()] = value.strip()
+        return result
     
-    return result
+    pattern = _key_value_pattern(delimiter, separator)
+    return {match.group(1).strip(): match.group(2).strip() for match in pattern.finditer(text)}
+
+
+@lru_cache(maxsize=16)
+def _key_value_pattern(delimiter: str, separator: str) -> 're.Pattern[str]':
+    """Compile a single-pass key/value pattern for one-character delimiters."""
+    delim = re.escape(delimiter)
+    sep = re.escape(separator)
+    return re.compile(f'([^{sep}{delim}]*){delim}([^{sep}]*)')
@@ -2,26 +2,20 @@
 
 import re
 from typing import Any, Union, Optional, List
-from pathlib import Path
+
+
+# Camera IDs double as recording directory names, so keep them path-safe
+_CAMERA_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
 
 
 def is_valid_camera_id(camera_id: Union[str, int]) -> bool:
-    """Validate camera ID format."""
+    """Validate camera ID format (1-64 chars of [A-Za-z0-9_-], or a non-negative int)."""
+    if isinstance(camera_id, str):
+        return _CAMERA_ID_PATTERN.fullmatch(camera_id) is not None
+    
     if isinstance(camera_id, int):
         return camera_id >= 0
     
-    if isinstance(camera_id, str):
-        # Check if it's a numeric string
-        if camera_id.isdigit():
-            return int(camera_id) >= 0
-        
-        # Check if it's a valid file path or URL
-        if camera_id.startswith(('http://', 'https://', 'rtsp://', 'rtmp://')):
-            return _is_valid_url(camera_id)
-        
-        # Check if it's a valid file path
-        return Path(camera_id).exists() or _is_valid_path_format(camera_id)
-    
     return False
 
 
@@ -95,25 +89,4 @@ def validate_required_fields(data: dict, required_fields: List[str]) -> List[str
     for field in required_fields:
         if field not in data or data[field] is None:
             missing_fields.append(field)
-    return missing_fields
-
-
-def _is_valid_url(url: str) -> bool:
-    """Basic URL format validation."""
-    url_pattern = re.compile(
-        r'^(https?|rtsp|rtmp)://'  # protocol
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain
-        r'localhost|'  # localhost
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # IP address
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    return url_pattern.match(url) is not None
-
-
-def _is_valid_path_format(path: str) -> bool:
-    """Check if string has valid path format."""
-    try:
-        Path(path)
-        return True
-    except (ValueError, TypeError):
-        return False
+    return missing_fields
\ No newline at end of file
@@ -1,7 +1,10 @@
 """Dependency injection configuration and application composition root."""
 
 from typing import Protocol, Dict, Any
+from functools import cache
 import logging
+import sys
+import threading
 
 from .core.config.settings import app_config
 from .core.startup import ApplicationBootstrap, initialize_application
@@ -18,30 +21,38 @@ from .application.gateways.websocket_gateway import WebSocketGateway
 from .application.controllers.camera_controller import CameraController
 
 
+_MISSING = object()
+
+CAMERA_CONTROLLER_FACTORY = sys.intern('CameraControllerFactory')
+
+
 class ServiceContainer:
-    """Simple dependency injection container."""
+    """Simple dependency injection container.
+    
+    Services are keyed by the type object itself (hashed by identity); plain
+    string keys are still accepted for named factories.
+    """
     
     def __init__(self):
-        self._services: Dict[str, Any] = {}
+        self._services: Dict[Any, Any] = {}
         self._logger = logging.getLogger(__name__)
     
     def register(self, service_type, instance: Any) -> None:
         """Register a service instance."""
-        service_name = service_type.__name__ if hasattr(service_type, '__name__') else str(service_type)
-        self._services[service_name] = instance
-        self._logger.debug(f"Registered service: {service_name}")
+        self._services[service_type] = instance
+        self._logger.debug(f"Registered service: {getattr(service_type, '__name__', service_type)}")
     
     def get(self, service_type) -> Any:
         """Get a service instance."""
-        service_name = service_type.__name__ if hasattr(service_type, '__name__') else str(service_type)
-        if service_name not in self._services:
+        service = self._services.get(service_type, _MISSING)
+        if service is _MISSING:
+            service_name = getattr(service_type, '__name__', service_type)
             raise ValueError(f"Service {service_name} not registered")
-        return self._services[service_name]
+        return service
     
     def has(self, service_type) -> bool:
         """Check if service is registered."""
-        service_name = service_type.__name__ if hasattr(service_type, '__name__') else str(service_type)
-        return service_name in self._services
+        return service_type in self._services
 
 
 class ApplicationContainer:
@@ -51,12 +62,20 @@ class ApplicationContainer:
         self.container = ServiceContainer()
         self.bootstrap: ApplicationBootstrap = None
         self._initialized = False
+        self._init_lock = threading.Lock()
     
     def initialize(self, websocket_server=None) -> None:
         """Initialize all dependencies."""
         if self._initialized:
             return
         
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._initialize(websocket_server)
+    
+    def _initialize(self, websocket_server=None) -> None:
+        """Wire all dependencies; called once under the init lock."""
         # Initialize core bootstrap
         self.bootstrap = initialize_application()
         
@@ -73,17 +92,25 @@ class ApplicationContainer:
         
         # Register infrastructure services
         self.container.register(CleanupService, cleanup_service)
+        self.container.register(CameraService, camera_service)
+        self.container.register(VideoRecordingService, video_recording_service)
         camera_repository = CameraRepositoryImpl(camera_service=camera_service, websocket_gateway=websocket_gateway)
         self.container.register(ICameraRepository, camera_repository)
         
         # Register use cases
         camera_mgmt_usecase = CameraManagementUseCase(camera_repository)
         camera_status_usecase = CameraStatusUseCase(camera_repository)
-        broadcast_usecase = BroadcastMotionEventUseCase(websocket_gateway)
+        broadcast_usecase = BroadcastMotionEventUseCase(
+            websocket_gateway,
+            debounce_seconds=app_config.motion_detection.broadcast_debounce_seconds,
+            id_set_provider=camera_repository.get_camera_ids
+        )
         
         self.container.register(CameraManagementUseCase, camera_mgmt_usecase)
         self.container.register(CameraStatusUseCase, camera_status_usecase)
         self.container.register(BroadcastMotionEventUseCase, broadcast_usecase)
+        # Camera workers report motion transitions from their own threads
+        camera_service.motion_listener = broadcast_usecase.publish_threadsafe
         
         # Register application services with proper dependencies
         self.container.register(WebSocketGateway, websocket_gateway)
@@ -92,7 +119,7 @@ class ApplicationContainer:
         def camera_controller_factory(request, client_address, server):
             return CameraController(request, client_address, server, 
                                   camera_mgmt_usecase, camera_status_usecase)
-        self.container.register('CameraControllerFactory', camera_controller_factory)
+        self.container.register(CAMERA_CONTROLLER_FACTORY, camera_controller_factory)
         
         self._initialized = True
         
@@ -121,7 +148,7 @@ class ApplicationContainer:
     
     def get_camera_controller_class(self):
         """Get camera controller class factory."""
-        return self.container.get('CameraControllerFactory')
+        return self.container.get(CAMERA_CONTROLLER_FACTORY)
     
     def get_cleanup_service(self) -> CleanupService:
         """Get cleanup service instance."""
@@ -133,21 +160,24 @@ class ApplicationContainer:
         if self.container.has(CleanupService):
             cleanup_service = self.container.get(CleanupService)
             cleanup_service.stop()
+        
+        # Stop all camera workers (and their recordings) in parallel
+        if self.container.has(CameraService):
+            camera_service = self.container.get(CameraService)
+            camera_service.stop_all_cameras()
+        
+        # Give FFmpeg time to finalize the segments it was writing
+        if self.container.has(VideoRecordingService):
+            self.container.get(VideoRecordingService).wait_for_stopped()
             
         if self.bootstrap:
             self.bootstrap.shutdown()
 
 
-# Global container instance
-_container: ApplicationContainer = None
-
-
+@cache
 def get_container() -> ApplicationContainer:
     """Get the global application container."""
-    global _container
-    if _container is None:
-        _container = ApplicationContainer()
-    return _container
+    return ApplicationContainer()
 
 
 def initialize_container(websocket_server=None) -> ApplicationContainer:
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MotionEvent:
     camera_id: str
     motion_detected: bool
@@ -22,8 +22,11 @@ class MotionEvent:
     
     def to_dict(self) -> dict:
         """Convert MotionEvent to dictionary (e.g., for WebSocket message)"""
+        return {'type': 'motion_detection', **self.to_payload()}
+    
+    def to_payload(self) -> dict:
+        """Project event fields to a JSON-ready dict (cheaper than dataclasses.asdict)"""
         return {
-            'type': 'motion_detection',
             'camera_id': self.camera_id,
             'motion_detected': self.motion_detected,
             'timestamp': self.timestamp.isoformat(),
@@ -42,3 +42,33 @@ class ICameraRepository(ABC):
         """
         pass
 
+    async def batch_camera_status(self, camera_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get status for several cameras in one lookup.
+        
+        Implementations backed by a live service should override this to
+        serve the whole batch from one snapshot.
+        
+        Args:
+            camera_ids: Camera IDs to look up; unknown IDs are skipped
+            
+        Returns:
+            List[Dict[str, Any]]: Status dictionaries in request order
+        """
+        statuses = []
+        for camera_id in camera_ids:
+            statuses.extend(await self.list_cameras(camera_id))
+        return statuses
+
+    async def get_system_overview(self) -> Dict[str, Any]:
+        """Get system-wide camera counts and the camera list.
+        
+        Implementations may override this with a cheaper aggregate.
+        
+        Returns:
+            Dict[str, Any]: Overview with total_cameras and camera_list
+        """
+        cameras = await self.list_cameras()
+        return {
+            "total_cameras": len(cameras),
+            "camera_list": cameras
+        }
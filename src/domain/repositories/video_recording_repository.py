@@ -1,7 +1,7 @@
 """Video recording repository interface."""
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Set
 
 
 class IVideoRecordingRepository(ABC):
@@ -43,3 +43,12 @@ class IVideoRecordingRepository(ABC):
             bool: True if recording is active, False otherwise
         """
         pass
+    
+    @abstractmethod
+    def get_recording_ids(self) -> Set[str]:
+        """Get the IDs of all cameras that are currently recording.
+        
+        Returns:
+            Set[str]: Snapshot of recording camera IDs
+        """
+        pass
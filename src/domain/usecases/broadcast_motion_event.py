@@ -1,23 +1,57 @@
 """Broadcast motion event use case for real-time notifications."""
 
+import asyncio
 import logging
-from typing import Optional
+import threading
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+from websockets.exceptions import WebSocketException
 
 from src.domain.entities.motion_event import MotionEvent
-from src.core.utils.datetime_utils import utc_now
-from src.core.errors.exceptions import ValidationError, CameraError
+from src.core.utils.datetime_utils import utc_now_cached
+from src.core.errors.exceptions import ValidationError
 from src.application.gateways.websocket_gateway import WebSocketGateway
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of motion events waiting for the broadcaster task
+EVENT_QUEUE_SIZE = 256
+
+# Maximum number of events combined into a single WebSocket frame
+EVENT_BATCH_MAX = 32
+
+
+@lru_cache(maxsize=256)
+def _normalize_camera_id(camera_id: str) -> str:
+    """Strip a camera ID once; repeat IDs from the same cameras are cache hits."""
+    return camera_id.strip()
+
+
 class BroadcastMotionEventUseCase:
     """
     Use case for broadcasting motion detection events.
     This handles real-time notifications when motion is detected or stops.
     """
     
-    def __init__(self, websocket_gateway: WebSocketGateway):
+    def __init__(self, 
+                 websocket_gateway: WebSocketGateway, 
+                 debounce_seconds: float = 0.5,
+                 id_set_provider: Optional[Callable[[], FrozenSet[str]]] = None):
         self.websocket_gateway = websocket_gateway
+        self._id_set_provider = id_set_provider
+        self.debounce_seconds = debounce_seconds
+        self._last_state: Dict[str, bool] = {}
+        self._pending: Dict[str, Tuple[asyncio.TimerHandle, bool]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._drain_task: Optional[asyncio.Task] = None
+        # Transitions handed over by worker threads, waiting for the loop. A burst
+        # shares one loop wakeup: _wakeup_loop is set while a drain is scheduled there
+        self._inbox: Deque[Tuple[str, bool, Optional[str], datetime]] = deque()
+        self._inbox_lock = threading.Lock()
+        self._wakeup_loop: Optional[asyncio.AbstractEventLoop] = None
         logger.info("BroadcastMotionEventUseCase initialized")
     
     async def broadcast_motion_start(self, 
@@ -31,46 +65,16 @@ class BroadcastMotionEventUseCase:
             video_path: Optional path to the recorded video file
             
         Returns:
-            True if broadcast was successful, False otherwise
+            True if the event was accepted for broadcast, False otherwise
             
         Raises:
             ValidationError: If camera_id is invalid
-            CameraError: If broadcasting fails
         """
-        logger.info(f"Broadcasting motion start event for camera: {camera_id}")
-        
-        if not camera_id or not camera_id.strip():
-            logger.error("Attempted to broadcast motion start with empty camera_id")
-            raise ValidationError("Camera ID cannot be empty")
+        timestamp = utc_now_cached()
+        logger.info("Broadcasting motion start event for camera: %s", camera_id)
         
-        try:
-            sanitized_camera_id = camera_id.strip()
-            
-            # Check if WebSocket gateway has connected clients
-            client_count = self.websocket_gateway.get_client_count()
-            logger.debug(f"WebSocket gateway has {client_count} connected clients for motion start broadcast")
-            
-            motion_event = MotionEvent(
-                camera_id=sanitized_camera_id,
-                motion_detected=True,
-                timestamp=utc_now(),
-                video_path=video_path
-            )
-            
-            logger.debug(f"Created motion start event for camera {sanitized_camera_id}. "
-                        f"Video path: {video_path or 'None'}, Timestamp: {motion_event.timestamp}")
-            
-            await self.websocket_gateway.broadcast_motion_event(motion_event)
-            
-            logger.info(f"Successfully broadcasted motion start event for camera {sanitized_camera_id}")
-            return True
-            
-        except ValidationError:
-            raise  # Re-raise validation errors as-is
-        except Exception as e:
-            error_msg = f"Failed to broadcast motion start event for {camera_id}: {str(e)}"
-            logger.error(error_msg, exc_info=True)
-            raise CameraError(error_msg)
+        camera_id = self._validate_camera_id(camera_id, "start")
+        return self._debounce(camera_id, True, video_path, timestamp)
     
     async def broadcast_motion_stop(self, 
                                   camera_id: str, 
@@ -83,44 +87,206 @@ class BroadcastMotionEventUseCase:
             video_path: Optional path to the final recorded video file
             
         Returns:
-            True if broadcast was successful, False otherwise
+            True if the event was accepted for broadcast, False otherwise
             
         Raises:
             ValidationError: If camera_id is invalid
-            CameraError: If broadcasting fails
         """
-        logger.info(f"Broadcasting motion stop event for camera: {camera_id}")
+        timestamp = utc_now_cached()
+        logger.info("Broadcasting motion stop event for camera: %s", camera_id)
+        
+        camera_id = self._validate_camera_id(camera_id, "stop")
+        return self._debounce(camera_id, False, video_path, timestamp)
+    
+    def publish_threadsafe(self, camera_id: str, motion_detected: bool,
+                           video_path: Optional[str] = None) -> bool:
+        """
+        Hand a motion transition from another thread (a camera worker) to the
+        WebSocket gateway's event loop, where debouncing and broadcast happen.
         
-        if not camera_id or not camera_id.strip():
-            logger.error("Attempted to broadcast motion stop with empty camera_id")
+        Events are appended to an inbox; only the first event of a burst pays
+        for call_soon_threadsafe, and the loop drains everything queued by then.
+        
+        Args:
+            camera_id: The ID of the camera whose motion state changed
+            motion_detected: True for motion start, False for motion stop
+            video_path: Optional path to the recorded video file
+            
+        Returns:
+            True if the event was scheduled, False if the gateway loop is not running
+        """
+        loop = self.websocket_gateway.loop
+        if loop is None or loop.is_closed():
+            return False
+        # Stamped here: the loop may only get to it a wakeup later
+        timestamp = utc_now_cached()
+        with self._inbox_lock:
+            self._inbox.append((camera_id, motion_detected, video_path, timestamp))
+            if self._wakeup_loop is loop:
+                return True  # A drain is already scheduled on this loop
+            # Unset, or left pointing at a previous (stopped) gateway loop
+            self._wakeup_loop = loop
+        try:
+            loop.call_soon_threadsafe(self._drain_inbox)
+        except RuntimeError:
+            # Loop closed between the check and the call; nobody will drain these
+            with self._inbox_lock:
+                self._inbox.clear()
+                self._wakeup_loop = None
+            return False
+        return True
+    
+    def _drain_inbox(self) -> None:
+        """Loop-side half of publish_threadsafe: feed queued transitions to the debouncer."""
+        with self._inbox_lock:
+            self._wakeup_loop = None
+            events = list(self._inbox)
+            self._inbox.clear()
+        for camera_id, motion_detected, video_path, timestamp in events:
+            self._publish(camera_id, motion_detected, video_path, timestamp)
+    
+    def _publish(self, camera_id: str, motion_detected: bool, video_path: Optional[str],
+                 timestamp: datetime) -> None:
+        """Validate one handed-over transition and pass it to the debouncer."""
+        if motion_detected:
+            try:
+                camera_id = self._validate_camera_id(camera_id, "start")
+            except ValidationError:
+                return
+        else:
+            # Stops are always accepted: the camera may have just been removed mid-event
+            camera_id = _normalize_camera_id(camera_id)
+        self._debounce(camera_id, motion_detected, video_path, timestamp)
+    
+    def _validate_camera_id(self, camera_id: str, motion_type: str) -> str:
+        """Return the normalized camera ID or raise ValidationError."""
+        normalized = _normalize_camera_id(camera_id) if camera_id else ""
+        if not normalized:
+            logger.error("Attempted to broadcast motion %s with empty camera_id", motion_type)
             raise ValidationError("Camera ID cannot be empty")
         
+        if self._id_set_provider is not None and normalized not in self._id_set_provider():
+            logger.error("Attempted to broadcast motion %s for unknown camera %s", motion_type, normalized)
+            raise ValidationError(f"Unknown camera ID: {normalized}")
+        
+        return normalized
+    
+    def _debounce(self, camera_id: str, motion_detected: bool, video_path: Optional[str],
+                  timestamp: datetime) -> bool:
+        """
+        Coalesce rapid start/stop flips for a camera.
+        
+        A state change is held for the debounce window; if the opposite state
+        arrives before it fires, both are dropped. Repeats of the current
+        state are ignored. The event keeps the timestamp of the transition,
+        not of the flush.
+        """
+        pending = self._pending.pop(camera_id, None)
+        if pending is not None:
+            pending_handle, pending_state = pending
+            if motion_detected == pending_state:
+                # Same transition already scheduled - keep it
+                self._pending[camera_id] = pending
+            else:
+                # Flipped back within the window - cancel both
+                pending_handle.cancel()
+                logger.debug("Coalesced motion flip for camera %s", camera_id)
+            return True
+        
+        if motion_detected == self._last_state.get(camera_id, False):
+            logger.debug("Motion state for camera %s unchanged, skipping broadcast", camera_id)
+            return True
+        
+        if self.debounce_seconds <= 0:
+            self._flush(camera_id, motion_detected, video_path, timestamp)
+            return True
+        
+        loop = asyncio.get_running_loop()
+        handle = loop.call_later(self.debounce_seconds, self._flush,
+                                 camera_id, motion_detected, video_path, timestamp)
+        self._pending[camera_id] = (handle, motion_detected)
+        return True
+    
+    def _flush(self, camera_id: str, motion_detected: bool, video_path: Optional[str],
+               timestamp: datetime) -> None:
+        """Commit a debounced state change and queue it for broadcast."""
+        self._pending.pop(camera_id, None)
+        self._last_state[camera_id] = motion_detected
+        
+        motion_event = MotionEvent(
+            camera_id=camera_id,
+            motion_detected=motion_detected,
+            timestamp=timestamp,
+            video_path=video_path
+        )
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Created motion %s event for camera %s. Video path: %s, Timestamp: %s",
+                         "start" if motion_detected else "stop", camera_id,
+                         video_path or 'None', motion_event.timestamp)
+        
+        self._enqueue(motion_event)
+    
+    def _enqueue(self, motion_event: MotionEvent) -> None:
+        """
+        Hand an event to the broadcaster task without waiting on clients.
+        
+        The queue is bounded; when it is full the oldest event is dropped so a
+        slow WebSocket client can never stall the producer.
+        """
+        if self._drain_task is None or self._drain_task.done():
+            # (Re)bind the queue and broadcaster to the currently running loop,
+            # carrying over anything the previous broadcaster never sent
+            old_queue = self._queue
+            self._queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+            if old_queue is not None and not old_queue.empty():
+                logger.warning("Broadcaster restarted with %d undelivered motion events", old_queue.qsize())
+                while not old_queue.empty():
+                    self._queue.put_nowait(old_queue.get_nowait())
+            self._drain_task = asyncio.get_running_loop().create_task(self._drain())
+        
         try:
-            sanitized_camera_id = camera_id.strip()
-            
-            # Check if WebSocket gateway has connected clients
-            client_count = self.websocket_gateway.get_client_count()
-            logger.debug(f"WebSocket gateway has {client_count} connected clients for motion stop broadcast")
-            
-            motion_event = MotionEvent(
-                camera_id=sanitized_camera_id,
-                motion_detected=False,
-                timestamp=utc_now(),
-                video_path=video_path
-            )
+            self._queue.put_nowait(motion_event)
+        except asyncio.QueueFull:
+            dropped = self._queue.get_nowait()
+            logger.warning("Motion event queue full, dropping oldest event for camera %s", dropped.camera_id)
+            self._queue.put_nowait(motion_event)
+    
+    async def _drain(self) -> None:
+        """
+        Broadcaster task: drain up to EVENT_BATCH_MAX queued events at a time
+        and send them as one frame. Back-to-back repeats of the same state for
+        a camera collapse to the newest; start/stop transitions are all kept.
+        """
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < EVENT_BATCH_MAX:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
             
-            logger.debug(f"Created motion stop event for camera {sanitized_camera_id}. "
-                        f"Video path: {video_path or 'None'}, Timestamp: {motion_event.timestamp}")
+            coalesced = [
+                motion_event for index, motion_event in enumerate(batch)
+                if index + 1 == len(batch)
+                or batch[index + 1].camera_id != motion_event.camera_id
+                or batch[index + 1].motion_detected != motion_event.motion_detected
+            ]
+            await self._broadcast(coalesced)
+    
+    async def _broadcast(self, motion_events: List[MotionEvent]) -> None:
+        """Send a batch of motion events through the WebSocket gateway."""
+        try:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("WebSocket gateway has %d connected clients for broadcast of %d motion events",
+                             self.websocket_gateway.get_client_count(), len(motion_events))
             
-            # Broadcast via WebSocket to clients
-            await self.websocket_gateway.broadcast_motion_event(motion_event)
+            await self.websocket_gateway.broadcast_motion_events(motion_events)
             
-            logger.info(f"Successfully broadcasted motion stop event for camera {sanitized_camera_id}")
-            return True
+            logger.info("Successfully broadcasted %d motion events", len(motion_events))
             
-        except ValidationError:
-            raise  # Re-raise validation errors as-is
-        except Exception as e:
-            error_msg = f"Failed to broadcast motion stop event for {camera_id}: {str(e)}"
-            logger.error(error_msg, exc_info=True)
-            raise CameraError(error_msg)
\ No newline at end of file
+        except asyncio.CancelledError:
+            raise
+        except (ConnectionError, OSError, WebSocketException) as e:
+            logger.error("Failed to broadcast %d motion events: %s", len(motion_events), e, exc_info=True)
@@ -4,7 +4,7 @@ from typing import Tuple
 
 from src.domain.entities.camera import Camera
 from src.domain.repositories.camera_repository import ICameraRepository
-from src.core.errors.exceptions import ValidationError, CameraError
+from src.core.errors.exceptions import ValidationError
 from src.core.utils.validation import is_valid_camera_id
 
 
@@ -27,6 +27,8 @@ class CameraManagementUseCase:
             
         Raises:
             ValidationError: If camera_id or rtsp_url are invalid
+            CameraAlreadyExistsError: If the camera is already registered
+            CameraError: If the camera could not be started
         """
         # Validate inputs
         if not is_valid_camera_id(camera_id):
@@ -41,14 +43,12 @@ class CameraManagementUseCase:
             rtsp_url=rtsp_url.strip()
         )
         
-        try:
-            success = await self.camera_repository.add_camera(camera)
-            if success:
-                return True, f"Camera {camera_id} added successfully"
-            else:
-                return False, f"Failed to add camera {camera_id}"
-        except Exception as e:
-            raise CameraError(f"Error adding camera {camera_id}: {str(e)}")
+        # Repository raises typed CameraError subclasses; let them propagate
+        success = await self.camera_repository.add_camera(camera)
+        if success:
+            return True, f"Camera {camera_id} added successfully"
+        else:
+            return False, f"Failed to add camera {camera_id}"
     
     async def delete_camera(self, camera_id: str) -> Tuple[bool, str]:
         """
@@ -62,17 +62,15 @@ class CameraManagementUseCase:
             
         Raises:
             ValidationError: If camera_id is invalid
+            CameraNotFoundError: If the camera is not registered
             CameraError: If deletion fails
         """
         if not is_valid_camera_id(camera_id):
             raise ValidationError(f"Invalid camera ID: {camera_id}")
         
-        try:
-            success = await self.camera_repository.delete_camera(camera_id)
-            if success:
-                return True, f"Camera {camera_id} deleted successfully"
-            else:
-                return False, f"Camera {camera_id} not found or could not be deleted"
-        except Exception as e:
-            raise CameraError(f"Error deleting camera {camera_id}: {str(e)}")
+        success = await self.camera_repository.delete_camera(camera_id)
+        if success:
+            return True, f"Camera {camera_id} deleted successfully"
+        else:
+            return False, f"Camera {camera_id} not found or could not be deleted"
     
@@ -36,6 +36,21 @@ class CameraStatusUseCase:
         """
         return await self.camera_repository.list_cameras()
     
+    async def list_cameras_with_status(self) -> List[Dict[str, Any]]:
+        """
+        Get all cameras merged with their live status.
+        
+        Status for every camera comes from one batched repository lookup.
+        
+        Returns:
+            List of camera information, with is_active/is_recording where known
+        """
+        cameras = await self.camera_repository.list_cameras()
+        statuses = await self.camera_repository.batch_camera_status(
+            [camera["camera_id"] for camera in cameras])
+        status_by_id = {status["camera_id"]: status for status in statuses}
+        return [{**camera, **status_by_id.get(camera["camera_id"], {})} for camera in cameras]
+    
     async def get_system_overview(self) -> Dict[str, Any]:
         """
         Get system-wide overview statistics.
@@ -43,9 +58,4 @@ class CameraStatusUseCase:
         Returns:
             Dictionary containing system overview metrics
         """
-        cameras = await self.list_all_cameras()
-        
-        return {
-            "total_cameras": len(cameras),
-            "camera_list": cameras
-        }
\ No newline at end of file
+        return await self.camera_repository.get_system_overview()
\ No newline at end of file
@@ -1,19 +1,37 @@
 """Implementation of camera repository using clean architecture services."""
 
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple, Union
 import threading
 import asyncio
-from dataclasses import asdict
 
 from src.domain.entities.camera import Camera
 from src.domain.repositories.camera_repository import ICameraRepository
-from src.core.errors.exceptions import CameraError, ValidationError
-from src.core.utils.validation import is_valid_camera_id
-from src.core.utils.datetime_utils import utc_now
+from src.core.errors.exceptions import CameraAlreadyExistsError, CameraError, CameraNotFoundError
+
+
+# Camera service operations return (success, message) or a plain bool
+CameraServiceResult = Union[Tuple[bool, str], bool]
+
+
+class _CameraTable(NamedTuple):
+    """Immutable structure-of-arrays snapshot of registered cameras."""
+    ids: Tuple[str, ...]
+    urls: Tuple[str, ...]
+    index: Dict[str, int]
+
+
+_EMPTY_TABLE = _CameraTable((), (), {})
 
 
 class CameraRepositoryImpl(ICameraRepository):
-    """Complete implementation of camera repository with WebSocket support."""
+    """Complete implementation of camera repository with WebSocket support.
+    
+    Cameras are stored structure-of-arrays style in an immutable _CameraTable:
+    parallel id/url tuples with an index mapping camera_id to its row. Writers
+    build a new table under the lock and rebind it (copy-on-write); readers
+    take the current table without locking. Whether a camera is active is
+    not stored here; it is read live from the camera service.
+    """
     
     def __init__(self, camera_service=None, websocket_gateway=None):
         """Initialize camera repository.
@@ -24,55 +42,143 @@ class CameraRepositoryImpl(ICameraRepository):
         """
         self._camera_service = camera_service
         self._websocket_gateway = websocket_gateway
-        self._cameras: Dict[str, Camera] = {}
-        self._lock = threading.Lock()
+        # Bind service operations once instead of probing with hasattr per call
+        self._service_add_camera: Optional[Callable[[Camera], CameraServiceResult]] = \
+            getattr(camera_service, 'add_camera', None)
+        self._service_delete_camera: Optional[Callable[[str], CameraServiceResult]] = \
+            getattr(camera_service, 'delete_camera', None)
+        self._table: _CameraTable = _EMPTY_TABLE
+        self._camera_ids: FrozenSet[str] = frozenset()
+        self._entries_cache: Optional[Tuple[_CameraTable, Tuple[Dict[str, Any], ...]]] = None
+        # Serializes writers only; HTTP handlers run on separate threads/loops
+        self._write_lock = threading.Lock()
+    
+    async def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking camera service call on the default executor.
+        
+        The service serializes on a threading.Lock and stop_camera joins the
+        worker thread, so calling it inline would stall the event loop.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+    
+    async def batch_camera_status(self, camera_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get live service status for several cameras in one service call."""
+        batch_status = getattr(self._camera_service, 'batch_status', None)
+        if batch_status is None:
+            return await super().batch_camera_status(camera_ids)
+        return await self._call(batch_status, tuple(camera_ids))
+    
+    def get_camera_ids(self) -> FrozenSet[str]:
+        """Get an immutable snapshot of registered camera IDs."""
+        return self._camera_ids
+    
+    def _publish(self, ids: List[str], urls: List[str]) -> None:
+        """Rebind a new immutable table. Caller must hold the write lock."""
+        index = {cam_id: row for row, cam_id in enumerate(ids)}
+        self._table = _CameraTable(tuple(ids), tuple(urls), index)
+        self._camera_ids = frozenset(index)
+    
+    def _store_camera(self, camera: Camera) -> None:
+        """Insert or update a camera row. Caller must hold the write lock."""
+        table = self._table
+        ids, urls = list(table.ids), list(table.urls)
+        row = table.index.get(camera.camera_id)
+        if row is not None:
+            urls[row] = camera.rtsp_url
+            self._publish(ids, urls)
+            return
+        
+        ids.append(camera.camera_id)
+        urls.append(camera.rtsp_url)
+        self._publish(ids, urls)
+    
+    def _drop_camera(self, camera_id: str) -> None:
+        """Remove a camera row by swapping in the last row. Caller must hold the write lock."""
+        table = self._table
+        row = table.index.get(camera_id)
+        if row is None:
+            return
+        
+        ids, urls = list(table.ids), list(table.urls)
+        last = len(ids) - 1
+        if row != last:
+            ids[row] = ids[last]
+            urls[row] = urls[last]
+        
+        ids.pop()
+        urls.pop()
+        self._publish(ids, urls)
+    
+    def _camera_entries(self, table: _CameraTable) -> Tuple[Dict[str, Any], ...]:
+        """Get per-camera info dicts, built once per table snapshot."""
+        cached = self._entries_cache
+        if cached is not None and cached[0] is table:
+            return cached[1]
+        
+        entries = tuple(
+            {"camera_id": cam_id, "rtsp_url": url}
+            for cam_id, url in zip(table.ids, table.urls)
+        )
+        self._entries_cache = (table, entries)
+        return entries
     
     async def add_camera(self, camera: Camera) -> bool:
-        """Add a new camera."""
-        try:
-            # Store camera in memory
-            with self._lock:
-                self._cameras[camera.camera_id] = camera
-            
-            # Add to camera service if available
-            if self._camera_service and hasattr(self._camera_service, 'add_camera'):
-                result = self._camera_service.add_camera(camera)
-                if hasattr(result, '__iter__') and not isinstance(result, str):
-                    # Result is a tuple (success, message)
-                    success, message = result
-                    if not success:
-                        raise CameraError(f"Failed to add camera: {message}")
-                elif not result:
-                    raise CameraError(f"Failed to add camera {camera.camera_id}")
-            
-            return True
-            
-        except Exception as e:
-            raise CameraError(f"Error adding camera {camera.camera_id}: {str(e)}") from e
+        """Add a new camera.
+        
+        Raises:
+            CameraAlreadyExistsError: If the camera is already registered
+            CameraError: If the camera service fails to start it
+        """
+        # Store camera in memory
+        with self._write_lock:
+            if camera.camera_id in self._table.index:
+                raise CameraAlreadyExistsError(
+                    f"Camera {camera.camera_id} already exists",
+                    "CAMERA_ALREADY_EXISTS", {"camera_id": camera.camera_id})
+            self._store_camera(camera)
+        
+        # Add to camera service if available
+        if self._service_add_camera is not None:
+            result = await self._call(self._service_add_camera, camera)
+            if isinstance(result, tuple):
+                # Result is a tuple (success, message)
+                success, message = result
+            else:
+                success, message = result, f"Failed to add camera {camera.camera_id}"
+            if not success:
+                with self._write_lock:
+                    self._drop_camera(camera.camera_id)
+                raise CameraError(f"Failed to add camera: {message}")
+        
+        return True
     
     async def remove_camera(self, camera_id: str) -> bool:
-        """Remove a camera."""
-        try:
-            # Remove from memory
-            with self._lock:
-                if camera_id in self._cameras:
-                    del self._cameras[camera_id]
-            
-            # Remove from camera service if available
-            if self._camera_service and hasattr(self._camera_service, 'delete_camera'):
-                result = self._camera_service.delete_camera(camera_id)
-                if hasattr(result, '__iter__') and not isinstance(result, str):
-                    # Result is a tuple (success, message)
-                    success, message = result
-                    if not success:
-                        raise CameraError(f"Failed to remove camera: {message}")
-                elif not result:
-                    raise CameraError(f"Failed to remove camera {camera_id}")
-            
-            return True
-            
-        except Exception as e:
-            raise CameraError(f"Error removing camera {camera_id}: {str(e)}") from e
+        """Remove a camera.
+        
+        Raises:
+            CameraNotFoundError: If the camera is not registered
+            CameraError: If the camera service fails to stop it
+        """
+        # Remove from memory
+        with self._write_lock:
+            if camera_id not in self._table.index:
+                raise CameraNotFoundError(
+                    f"Camera {camera_id} not found",
+                    "CAMERA_NOT_FOUND", {"camera_id": camera_id})
+            self._drop_camera(camera_id)
+        
+        # Remove from camera service if available
+        if self._service_delete_camera is not None:
+            result = await self._call(self._service_delete_camera, camera_id)
+            if isinstance(result, tuple):
+                # Result is a tuple (success, message)
+                success, message = result
+                if not success:
+                    raise CameraError(f"Failed to remove camera: {message}")
+            elif not result:
+                raise CameraError(f"Failed to remove camera {camera_id}")
+        
+        return True
     
     async def delete_camera(self, camera_id: str) -> bool:
         """Delete a camera (alias for remove_camera to match interface)."""
@@ -80,45 +186,48 @@ class CameraRepositoryImpl(ICameraRepository):
     
     async def list_cameras(self, camera_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """List all cameras or get specific camera by ID."""
-        try:
-            # If camera_id is specified, return specific camera
-            if camera_id:
-                with self._lock:
-                    if camera_id in self._cameras:
-                        camera = self._cameras[camera_id]
-                        return [{
-                            "camera_id": camera.camera_id,
-                            "rtsp_url": camera.rtsp_url
-                        }]
+        table = self._table
+        
+        # If camera_id is specified, return specific camera
+        if camera_id:
+            row = table.index.get(camera_id)
+            if row is None:
                 return []
-            
-            # Get all cameras from memory
-            cameras = []
-            with self._lock:
-                for camera in self._cameras.values():
-                    cameras.append({
-                        "camera_id": camera.camera_id,
-                        "rtsp_url": camera.rtsp_url
-                    })
-            
-            return cameras
-            
-        except Exception as e:
-            raise CameraError(f"Error listing cameras: {str(e)}") from e
+            return [{
+                "camera_id": table.ids[row],
+                "rtsp_url": table.urls[row]
+            }]
+        
+        return list(self._camera_entries(table))
+    
+    async def get_system_overview(self) -> Dict[str, Any]:
+        """Get camera counts and the camera list.
+        
+        The camera list is built once per table snapshot; the active count
+        comes from one batched live-status lookup per call, so cameras whose
+        workers died or are restarting count as inactive.
+        """
+        table = self._table
+        total = len(table.ids)
+        statuses = await self.batch_camera_status(list(table.ids))
+        active = sum(1 for status in statuses if status.get("is_active", True))
+        
+        return {
+            "total_cameras": total,
+            "active_cameras": active,
+            "inactive_cameras": total - active,
+            "camera_list": list(self._camera_entries(table))
+        }
     
     async def get_camera_status(self, camera_id: str) -> Optional[Dict[str, Any]]:
         """Get camera information."""
-        try:
-            # Check memory
-            with self._lock:
-                if camera_id in self._cameras:
-                    camera = self._cameras[camera_id]
-                    return {
-                        "camera_id": camera.camera_id,
-                        "rtsp_url": camera.rtsp_url
-                    }
-            
-            return None
-            
-        except Exception as e:
-            raise CameraError(f"Error getting camera {camera_id}: {str(e)}") from e
\ No newline at end of file
+        # Check memory
+        table = self._table
+        row = table.index.get(camera_id)
+        if row is not None:
+            return {
+                "camera_id": table.ids[row],
+                "rtsp_url": table.urls[row]
+            }
+        
+        return None
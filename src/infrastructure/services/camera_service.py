@@ -1,15 +1,54 @@
 """Camera service implementation."""
 
 import cv2
+import os
 import time
+import zlib
 import threading
-from typing import Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Any
 
 from src.domain.entities.camera import Camera
 from src.domain.repositories.camera_repository import ICameraRepository
 from src.domain.repositories.video_recording_repository import IVideoRecordingRepository
 from src.core.config.settings import app_config
 from src.core.utils.file_utils import ensure_directory_exists
+from src.core.utils.ring_log import log_line
+from src.infrastructure.services.ffmpeg_frame_reader import FFmpegFrameReader
+from src.infrastructure.services.frame_ring import FrameRing
+
+# Seconds a recording-state snapshot may be reused by status requests
+RECORDING_IDS_TTL = 0.1
+
+# Called from camera worker threads as listener(camera_id, motion_detected)
+MotionListener = Callable[[str, bool], None]
+
+
+def _pin_to_cpu(camera_id: str) -> None:
+    """Pin the calling thread to one CPU chosen stably from the camera ID.
+    
+    Threads it starts afterwards (the capture thread) inherit the affinity, so a
+    camera's capture and detection share one core's cache. Linux only.
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+        cpu = cpus[zlib.crc32(camera_id.encode()) % len(cpus)]
+        os.sched_setaffinity(0, {cpu})  # pid 0 = calling thread
+    except OSError as e:
+        log_line(f"[{camera_id}] Could not pin to CPU: {e}")
+
+
+@dataclass(slots=True)
+class CameraSlot:
+    """Runtime handles for one monitored camera; fields are never reassigned."""
+    worker: 'CameraWorker'
+    thread: threading.Thread
+    stop_event: threading.Event
+    rtsp_url: str
+    start_time: float
 
 
 class CameraWorker:
@@ -19,17 +58,36 @@ class CameraWorker:
                  camera_id: str, 
                  rtsp_url: str,
                  motion_detection_service,
-                 video_recording_service: IVideoRecordingRepository):
+                 video_recording_service: IVideoRecordingRepository,
+                 motion_listener: Optional[MotionListener] = None):
         self.camera_id = camera_id
         self.rtsp_url = rtsp_url
         self.motion_detection_service = motion_detection_service
         self.video_recording_service = video_recording_service
+        self.motion_listener = motion_listener
         self.thread_name = f"[{camera_id}]"
         
         # Motion state
         self.motion_detected = False
         self.last_motion_time = 0
         self.motion_start_time = 0
+        # Local mirror of recording state so the hot path never calls into the recorder
+        self.recording = False
+        # True while a stream is open and being analyzed; False between restarts
+        self.streaming = False
+        
+        # Motion state transitions, indexed by
+        # motion_detected << 2 | motion_this_frame << 1 | post_buffer_elapsed
+        self._transitions = (
+            self._ignore_motion,             # idle, no motion
+            self._ignore_motion,             # idle, no motion
+            self._start_motion_recording,    # idle, motion started
+            self._start_motion_recording,    # idle, motion started
+            self._ignore_motion,             # recording, quiet within post-buffer
+            self._motion_timed_out,          # recording, quiet past post-buffer
+            self._continue_motion,           # recording, motion continues
+            self._continue_motion,           # recording, motion continues
+        )
         
         # Configuration
         self.post_buffer_seconds = app_config.motion_detection.post_buffer_seconds
@@ -40,13 +98,12 @@ class CameraWorker:
     
     def run(self, stop_event: threading.Event):
         """Main worker loop."""
-        print(f"{self.thread_name} Starting camera worker...")
+        log_line(f"{self.thread_name} Starting camera worker...")
         
-        cap = cv2.VideoCapture(self.rtsp_url)
-        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        cap = self._open_capture()
         
         if not cap.isOpened():
-            print(f"{self.thread_name} Error: Could not open RTSP stream")
+            log_line(f"{self.thread_name} Error: Could not open RTSP stream")
             return
         
         # Get initial frame
@@ -58,119 +115,240 @@ class CameraWorker:
             time.sleep(app_config.performance.init_frame_wait)
         
         if not ret:
-            print(f"{self.thread_name} Error: Could not get initial frame")
+            log_line(f"{self.thread_name} Error: Could not get initial frame")
             cap.release()
             return
         
         fps = cap.get(cv2.CAP_PROP_FPS) or app_config.motion_detection.fps
-        height, width, _ = frame1.shape
-        print(f"{self.thread_name} Initialized: {width}x{height} at {fps} FPS")
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or frame1.shape[1]
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or frame1.shape[0]
+        log_line(f"{self.thread_name} Initialized: {width}x{height} at {fps} FPS")
         
         # Initialize motion detector
-        self.motion_detection_service.initialize_from_frame(frame1)
+        self.motion_detection_service.register(self.camera_id, frame1)
+        self.streaming = True
         
         try:
             self._main_loop(cap, stop_event)
         except KeyboardInterrupt:
-            print(f"{self.thread_name} Interrupted by user")
+            log_line(f"{self.thread_name} Interrupted by user")
         except Exception as e:
-            print(f"{self.thread_name} Error: {e}")
+            log_line(f"{self.thread_name} Error: {e}")
         finally:
             self._cleanup(cap)
     
-    def _main_loop(self, cap, stop_event):
-        """Main processing loop."""
+    def _open_capture(self):
+        """Open the stream with the configured capture backend.
+        
+        The FFmpeg backend pipes pre-scaled grayscale frames; if it cannot be
+        started (e.g. ffprobe/ffmpeg missing) OpenCV's VideoCapture is used.
+        """
+        if app_config.camera.capture_backend == 'ffmpeg':
+            reader = FFmpegFrameReader(self.rtsp_url, app_config.motion_detection.scale)
+            if reader.isOpened():
+                return reader
+            reader.release()
+            log_line(f"{self.thread_name} FFmpeg reader unavailable, falling back to OpenCV")
+        
+        cap = cv2.VideoCapture(self.rtsp_url)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+    
+    def _capture_loop(self, cap, stop_event, capture_done: threading.Event):
+        """
+        Capture thread: grab every packet so the stream never backs up, but only
+        decode (retrieve) a frame when the detection loop is ready for one.
+        """
         consecutive_failures = 0
         max_failures = 5
+        ring = self._frame_ring
         
-        while True:
-            if stop_event and stop_event.is_set():
-                print(f"{self.thread_name} Stopping camera thread...")
-                break
-            
-            ret, frame = cap.read()
-            if not ret:
-                consecutive_failures += 1
-                print(f"{self.thread_name} Failed to read frame ({consecutive_failures}/{max_failures})")
+        try:
+            while not stop_event.is_set() and not capture_done.is_set():
+                ret = cap.grab()
+                # Read the flag once: the detection thread may set it at any point, and
+                # only a frame retrieved in this iteration may be published
+                wanted = self._frame_wanted
+                if ret and wanted:
+                    # Decode into the ring's preallocated slot (reallocated only on size change)
+                    ret, frame = cap.retrieve(ring.next_slot())
+                if not ret:
+                    consecutive_failures += 1
+                    log_line(f"{self.thread_name} Failed to read frame ({consecutive_failures}/{max_failures})")
+                    
+                    if consecutive_failures >= max_failures:
+                        log_line(f"{self.thread_name} Too many frame failures. Worker will restart.")
+                        break  # Exit and let the worker restart
+                    
+                    stop_event.wait(1)
+                    continue
                 
-                if consecutive_failures >= max_failures:
-                    print(f"{self.thread_name} Too many frame failures. Worker will restart.")
-                    break  # Exit and let the worker restart
+                # Reset failure counter on successful read
+                consecutive_failures = 0
                 
-                time.sleep(1)
-                continue
-            
-            # Reset failure counter on successful read
-            consecutive_failures = 0
-            
-            # Motion detection
-            motion_this_frame, _ = self.motion_detection_service.detect_motion(frame)
-            
-            if not self.motion_detection_service.should_skip_frame():
-                self._handle_motion_detection(motion_this_frame)
-            
-            # Fixed sleep instead of adaptive
-            time.sleep(0.05)
+                if not wanted:
+                    continue  # Stale frame dropped without decoding
+                
+                # Publish: the slot is written, now bump the sequence (overwrite when full)
+                self._frame_wanted = False
+                ring.publish(frame)
+        finally:
+            capture_done.set()
     
-    def _handle_motion_detection(self, motion_this_frame: bool):
-        """Handle motion detection logic."""
-        current_time = time.time()
+    def _main_loop(self, cap, stop_event):
+        """Main processing loop, consuming the freshest frame from the capture thread."""
+        self._frame_ring = ring = FrameRing()
+        self._frame_wanted = False
+        capture_done = threading.Event()
+        capture_thread = threading.Thread(
+            target=self._capture_loop,
+            args=(cap, stop_event, capture_done),
+            name=f"Capture-{self.camera_id}",
+            daemon=True
+        )
+        capture_thread.start()
         
-        if motion_this_frame:
-            if not self.motion_detected:
-                # Motion just started - begin recording
-                self._start_motion_recording()
-            else:
-                # Motion continues - update last motion time
-                self.last_motion_time = current_time
-                # Note: Chunking is now handled automatically by FFmpeg segmentation
-        else:
-            # Check if motion has stopped for post_buffer_seconds
-            if (self.motion_detected and 
-                current_time - self.last_motion_time > self.post_buffer_seconds):
-                self._stop_motion_recording()
+        # Bind hot-path lookups once; monotonic time is immune to wall-clock jumps
+        detector = self.motion_detection_service
+        camera_id = self.camera_id
+        handle_motion = self._handle_motion_detection
+        post_buffer = self.post_buffer_seconds
+        monotonic = time.monotonic
+        # Pace on the stop event so shutdown interrupts the wait immediately
+        pause = stop_event.wait
+        
+        last_seq = 0
+        try:
+            while True:
+                if stop_event and stop_event.is_set():
+                    log_line(f"{self.thread_name} Stopping camera thread...")
+                    break
+                
+                if detector.peek_skip(camera_id):
+                    # Detector would drop this frame anyway; don't ask for a decode
+                    if capture_done.is_set():
+                        break  # Capture gave up; let the worker restart
+                    detector.skip_frame(camera_id)
+                    pause(0.05)
+                    continue
+                
+                # Ask the capture thread to decode the next grabbed frame
+                self._frame_wanted = True
+                seq = ring.seq
+                if seq == last_seq:
+                    if capture_done.is_set():
+                        break  # Capture gave up; let the worker restart
+                    pause(0.01)
+                    continue
+                
+                frame = ring.latest()
+                last_seq = seq
+                
+                # Motion detection
+                motion_this_frame, _ = detector.detect_motion(camera_id, frame)
+                
+                if not detector.should_skip_frame(camera_id):
+                    handle_motion(motion_this_frame, monotonic(), post_buffer)
+                
+                # Fixed sleep instead of adaptive
+                pause(0.05)
+        finally:
+            capture_done.set()
+            # cap is released by _cleanup, so wait for any in-flight read first
+            capture_thread.join(timeout=10)
+    
+    def _handle_motion_detection(self, motion_this_frame: bool, current_time: float,
+                                 post_buffer: float):
+        """Handle motion detection logic.
+        
+        Args:
+            motion_this_frame: Whether motion was detected in the current frame
+            current_time: time.monotonic() reading for this frame
+            post_buffer: Seconds without motion before recording stops
+        """
+        # Pack (motion_detected, motion_this_frame, post_buffer_elapsed) into a 3-bit index
+        key = (self.motion_detected << 2 | motion_this_frame << 1 |
+               (current_time - self.last_motion_time > post_buffer))
+        self._transitions[key](current_time)
+    
+    def _ignore_motion(self, current_time: float):
+        """No state change for this frame."""
+    
+    def _continue_motion(self, current_time: float):
+        """Motion continues - update last motion time (FFmpeg handles chunking)."""
+        self.last_motion_time = current_time
+    
+    def _motion_timed_out(self, current_time: float):
+        """Motion has been absent for post_buffer_seconds - stop recording."""
+        self._stop_motion_recording()
     
-    def _start_motion_recording(self):
+    def _start_motion_recording(self, current_time: float):
         """Start recording when motion is detected."""
         self.motion_detected = True
-        current_time = time.time()
         self.motion_start_time = self.last_motion_time = current_time
         
-        print(f"{self.thread_name} Motion detected. Starting recording...")
+        log_line(f"{self.thread_name} Motion detected. Starting recording...")
         
         # Start recording (FFmpeg will handle chunking automatically)
-        success = self.video_recording_service.start_recording(self.camera_id, self.rtsp_url)
-        if not success:
-            print(f"{self.thread_name} Failed to start recording")
+        self.recording = self.video_recording_service.start_recording(self.camera_id, self.rtsp_url)
+        if not self.recording:
+            log_line(f"{self.thread_name} Failed to start recording")
+        self._notify_motion(True)
     
     def _stop_motion_recording(self):
         """Stop recording when motion ends."""
-        print(f"{self.thread_name} Motion stopped. Stopping recording after "
-              f"{self.post_buffer_seconds}s post-buffer...")
+        log_line(f"{self.thread_name} Motion stopped. Stopping recording after "
+                 f"{self.post_buffer_seconds}s post-buffer...")
         
         # Stop recording
         self.motion_detected = False
-        self.video_recording_service.stop_recording(self.camera_id)
+        if self.recording:
+            self.recording = False
+            self.video_recording_service.stop_recording(self.camera_id)
+        self._notify_motion(False)
+    
+    def _notify_motion(self, motion_detected: bool):
+        """Report a motion start/stop transition to the listener, if any."""
+        if self.motion_listener is None:
+            return
+        try:
+            self.motion_listener(self.camera_id, motion_detected)
+        except Exception as e:
+            log_line(f"{self.thread_name} Motion listener failed: {e}")
     
     def _cleanup(self, cap):
         """Cleanup resources."""
-        if self.video_recording_service.is_recording(self.camera_id):
+        self.streaming = False
+        if self.recording:
+            self.recording = False
             self.video_recording_service.stop_recording(self.camera_id)
+        if self.motion_detected:
+            # Worker is going away mid-event; don't leave clients showing motion
+            self.motion_detected = False
+            self._notify_motion(False)
         
+        self.motion_detection_service.unregister(self.camera_id)
         cap.release()
-        print(f"{self.thread_name} Camera worker stopped")
+        log_line(f"{self.thread_name} Camera worker stopped")
 
 
 class CameraService(ICameraRepository):
-    """Thread-safe camera management service."""
+    """Thread-safe camera management service.
+    
+    self.cameras is copy-on-write: add/stop build a new dict under self.lock
+    and rebind it, so status reads take the current dict without locking.
+    """
     
     def __init__(self, 
                  motion_detection_service,
                  video_recording_service: IVideoRecordingRepository):
         self.motion_detection_service = motion_detection_service
         self.video_recording_service = video_recording_service
-        self.cameras = {}  # camera_id -> {"worker": worker, "thread": thread, "stop_event": stop_event}
+        # Receives motion transitions from worker threads; set by the container
+        self.motion_listener: Optional[MotionListener] = None
+        self.cameras: Dict[str, CameraSlot] = {}
         self.lock = threading.Lock()
+        self._recording_ids_cache: Optional[Tuple[float, Set[str]]] = None
     
     def add_camera(self, camera: Camera) -> Tuple[bool, str]:
         """Add and start monitoring a camera."""
@@ -187,7 +365,8 @@ class CameraService(ICameraRepository):
                     camera_id, 
                     rtsp_url, 
                     self.motion_detection_service,
-                    self.video_recording_service
+                    self.video_recording_service,
+                    self.motion_listener
                 )
                 
                 thread = threading.Thread(
@@ -197,15 +376,15 @@ class CameraService(ICameraRepository):
                     daemon=True
                 )
                 
-                self.cameras[camera_id] = {
-                    "worker": worker,
-                    "thread": thread,
-                    "stop_event": stop_event,
-                    "rtsp_url": rtsp_url,
-                    "start_time": time.time()
-                }
-                
                 thread.start()
+                self.cameras = {**self.cameras, camera_id: CameraSlot(
+                    worker=worker,
+                    thread=thread,
+                    stop_event=stop_event,
+                    rtsp_url=rtsp_url,
+                    start_time=time.time()
+                )}
+                
                 return True, f"Camera {camera_id} started successfully"
                 
             except Exception as e:
@@ -213,17 +392,20 @@ class CameraService(ICameraRepository):
     
     def _run_worker_with_restart(self, worker, stop_event):
         """Run worker with automatic restart on failure."""
+        if app_config.performance.pin_camera_threads:
+            _pin_to_cpu(worker.camera_id)
+        
         while not stop_event.is_set():
             try:
-                print(f"{worker.thread_name} Starting worker...")
+                log_line(f"{worker.thread_name} Starting worker...")
                 worker.run(stop_event)
                 if not stop_event.is_set():
-                    print(f"{worker.thread_name} Worker crashed, restarting in 5 seconds...")
-                    time.sleep(5)
+                    log_line(f"{worker.thread_name} Worker crashed, restarting in 5 seconds...")
+                    stop_event.wait(5)
             except Exception as e:
                 if not stop_event.is_set():
-                    print(f"{worker.thread_name} Worker error: {e}, restarting in 5 seconds...")
-                    time.sleep(5)
+                    log_line(f"{worker.thread_name} Worker error: {e}, restarting in 5 seconds...")
+                    stop_event.wait(5)
     
     def delete_camera(self, camera_id: str) -> Tuple[bool, str]:
         """Stop and remove a camera."""
@@ -232,19 +414,21 @@ class CameraService(ICameraRepository):
     def stop_camera(self, camera_id: str) -> Tuple[bool, str]:
         """Stop a camera without removing it."""
         with self.lock:
-            camera_info = self.cameras.get(camera_id)
-            if not camera_info:
+            slot = self.cameras.get(camera_id)
+            if not slot:
                 return False, f"Camera {camera_id} not found"
             
             try:
                 # Signal the thread to stop
-                camera_info["stop_event"].set()
+                slot.stop_event.set()
                 
                 # Wait for thread to finish
-                camera_info["thread"].join(timeout=10)
+                slot.thread.join(timeout=10)
                 
                 # Remove from active cameras
-                del self.cameras[camera_id]
+                cameras = dict(self.cameras)
+                del cameras[camera_id]
+                self.cameras = cameras
                 
                 return True, f"Camera {camera_id} stopped successfully"
                 
@@ -253,40 +437,79 @@ class CameraService(ICameraRepository):
     
     def get_camera_status(self, camera_id: str) -> Optional[Dict]:
         """Get status information for a specific camera."""
-        with self.lock:
-            camera_info = self.cameras.get(camera_id)
-            if not camera_info:
-                return None
-            
-            return {
-                "camera_id": camera_id,
-                "rtsp_url": camera_info["rtsp_url"],
-                "start_time": camera_info["start_time"],
-                "is_active": camera_info["thread"].is_alive(),
-                "is_recording": self.video_recording_service.is_recording(camera_id)
-            }
+        slot = self.cameras.get(camera_id)
+        if not slot:
+            return None
+        
+        return self._build_status(camera_id, slot, self._recording_ids())
+    
+    def _recording_ids(self) -> Set[str]:
+        """Get recording camera IDs, reusing a snapshot younger than RECORDING_IDS_TTL."""
+        now = time.monotonic()
+        cached = self._recording_ids_cache
+        if cached is not None and now - cached[0] < RECORDING_IDS_TTL:
+            return cached[1]
+        
+        recording_ids = self.video_recording_service.get_recording_ids()
+        self._recording_ids_cache = (now, recording_ids)
+        return recording_ids
+    
+    def _build_status(self, camera_id: str, slot: 'CameraSlot',
+                      recording_ids: Set[str]) -> Dict[str, Any]:
+        """Build a status dict for one camera."""
+        return {
+            "camera_id": camera_id,
+            "rtsp_url": slot.rtsp_url,
+            "start_time": slot.start_time,
+            # The thread outlives failed streams while it retries, so also ask the worker
+            "is_active": slot.thread.is_alive() and slot.worker.streaming,
+            "is_recording": camera_id in recording_ids
+        }
     
     def list_cameras(self, camera_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """List all cameras with their status."""
-        with self.lock:
-            if camera_id is not None:
-                # Return specific camera status if camera_id provided
-                status = self.get_camera_status(camera_id)
-                return [status] if status is not None else []
-            else:
-                # Return all cameras
-                return [self.get_camera_status(cam_id) 
-                        for cam_id in self.cameras.keys()]
+        if camera_id is not None:
+            # Return specific camera status if camera_id provided
+            return self.batch_status((camera_id,))
+        
+        # Take one snapshot of the copy-on-write dict; no lock needed
+        cameras = self.cameras
+        recording_ids = self._recording_ids()
+        return [self._build_status(cam_id, slot, recording_ids)
+                for cam_id, slot in cameras.items()]
+    
+    def batch_status(self, camera_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Get status for several cameras from a single snapshot.
+        
+        Args:
+            camera_ids: Camera IDs to look up; unknown IDs are skipped
+            
+        Returns:
+            Status dicts for the cameras that exist, in request order
+        """
+        cameras = self.cameras
+        recording_ids = self._recording_ids()
+        return [self._build_status(cam_id, cameras[cam_id], recording_ids)
+                for cam_id in camera_ids if cam_id in cameras]
     
-    def stop_all_cameras(self) -> None:
-        """Stop all cameras."""
-        camera_ids = list(self.cameras.keys())
+    def stop_all_cameras(self, timeout: float = 10) -> None:
+        """Stop all cameras concurrently.
         
-        for camera_id in camera_ids:
-            success, _ = self.stop_camera(camera_id)
+        Every worker is signalled before any thread is joined, so total
+        shutdown time is bounded by the slowest camera rather than the sum.
+        """
+        with self.lock:
+            slots = list(self.cameras.values())
+            self.cameras = {}
+        
+        for slot in slots:
+            slot.stop_event.set()
+        
+        deadline = time.time() + timeout
+        for slot in slots:
+            slot.thread.join(timeout=max(0, deadline - time.time()))
     
     def is_camera_active(self, camera_id: str) -> bool:
         """Check if a camera is currently active."""
-        with self.lock:
-            camera_info = self.cameras.get(camera_id)
-            return camera_info is not None and camera_info["thread"].is_alive()
\ No newline at end of file
+        slot = self.cameras.get(camera_id)
+        return slot is not None and slot.thread.is_alive()
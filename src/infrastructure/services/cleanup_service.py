@@ -1,11 +1,13 @@
 """Background cleanup service for managing old recordings."""
 
+import os
 import time
 import threading
 from pathlib import Path
+from typing import Iterator
 
 from src.core.config.settings import app_config
-from src.core.utils.file_utils import cleanup_old_files, safe_remove_directory
+from src.core.utils.file_utils import cleanup_old_files
 
 
 class CleanupService:
@@ -102,22 +104,34 @@ class CleanupService:
         empty_dirs_removed = 0
         
         try:
-            # Get all directories, deepest first
-            all_dirs = []
-            for item in self.recordings_dir.rglob("*"):
-                if item.is_dir() and item != self.recordings_dir:
-                    all_dirs.append(item)
+            # Get all directories; the walk never stats files
+            all_dirs = list(_iter_dirs(str(self.recordings_dir)))
                     
             # Sort by depth (deepest first)
-            all_dirs.sort(key=lambda p: len(p.parts), reverse=True)
+            all_dirs.sort(key=lambda p: p.count(os.sep), reverse=True)
             
             for dir_path in all_dirs:
-                if not any(dir_path.iterdir()):  # Empty directory
-                    if safe_remove_directory(dir_path):
-                        print(f"Removed empty directory: {dir_path.relative_to(self.recordings_dir)}")
-                        empty_dirs_removed += 1
+                # rmdir only succeeds on an empty directory, so it is also the emptiness
+                # check, and it can never delete a segment FFmpeg just started writing
+                try:
+                    os.rmdir(dir_path)
+                except OSError:
+                    continue
+                print(f"Removed empty directory: {os.path.relpath(dir_path, self.recordings_dir)}")
+                empty_dirs_removed += 1
                         
         except Exception as e:
             print(f"Error removing empty directories: {e}")
             
         return empty_dirs_removed
+
+
+def _iter_dirs(root: str) -> Iterator[str]:
+    """Yield every directory below root (not root itself), parents before children."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield entry.path
+                    stack.append(entry.path)
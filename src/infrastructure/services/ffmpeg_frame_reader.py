@@ -0,0 +1,152 @@
+"""FFmpeg pipe frame reader for motion detection."""
+
+import subprocess
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+PROBE_TIMEOUT_SECONDS = 10
+
+
+class FFmpegFrameReader:
+    """Read downscaled grayscale frames from an RTSP stream through an FFmpeg pipe.
+    
+    FFmpeg does the decode, resize and gray conversion (libswscale) and writes
+    raw 8-bit frames to stdout, so the worker never sees full-resolution BGR.
+    Implements the subset of the cv2.VideoCapture interface used by CameraWorker.
+    """
+    
+    def __init__(self, rtsp_url: str, scale: float):
+        self.rtsp_url = rtsp_url
+        self._process: Optional[subprocess.Popen] = None
+        self._pending: Optional[bytes] = None
+        self._source_width = 0
+        self._source_height = 0
+        self._fps = 0.0
+        
+        probe = self._probe(rtsp_url)
+        if probe is None:
+            return
+        
+        self._source_width, self._source_height, self._fps = probe
+        scale = min(scale, 1.0)
+        self.width = max(1, round(self._source_width * scale))
+        self.height = max(1, round(self._source_height * scale))
+        self.frame_size = self.width * self.height
+        
+        ffmpeg_cmd = [
+            'ffmpeg',
+            '-hide_banner',
+            '-loglevel', 'error',
+            '-nostdin',
+            '-rtsp_transport', 'tcp',
+            # Detection wants the newest frame: no input buffering, minimal probing
+            '-fflags', 'nobuffer',
+            '-flags', 'low_delay',
+            '-probesize', '32',
+            '-analyzeduration', '0',
+            '-i', rtsp_url,
+            '-an',  # Video only
+            '-vf', f'scale={self.width}:{self.height}:flags=area,format=gray',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'gray',
+            'pipe:1'
+        ]
+        try:
+            self._process = subprocess.Popen(
+                ffmpeg_cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=self.frame_size * 4,
+                start_new_session=True  # Stopped by release(), not by the terminal's SIGINT
+            )
+        except OSError as e:
+            print(f"Error starting FFmpeg reader for {rtsp_url}: {e}")
+    
+    @staticmethod
+    def _probe(rtsp_url: str) -> Optional[Tuple[int, int, float]]:
+        """Get (width, height, fps) of the first video stream with ffprobe."""
+        probe_cmd = [
+            'ffprobe',
+            '-v', 'error',
+            '-rtsp_transport', 'tcp',
+            '-select_streams', 'v:0',
+            '-show_entries', 'stream=width,height,avg_frame_rate',
+            '-of', 'csv=p=0',
+            rtsp_url
+        ]
+        try:
+            result = subprocess.run(probe_cmd, capture_output=True, text=True,
+                                    timeout=PROBE_TIMEOUT_SECONDS)
+            width, height, rate = result.stdout.strip().splitlines()[0].split(',')[:3]
+            num, _, den = rate.partition('/')
+            fps = float(num) / float(den) if den and float(den) else 0.0
+            return int(width), int(height), fps
+        except (OSError, subprocess.TimeoutExpired, ValueError, IndexError):
+            return None
+    
+    def isOpened(self) -> bool:
+        """Check whether the FFmpeg process is running."""
+        return self._process is not None and self._process.poll() is None
+    
+    def grab(self) -> bool:
+        """Read the next raw frame from the pipe."""
+        if self._process is None:
+            return False
+        data = self._process.stdout.read(self.frame_size)
+        if len(data) < self.frame_size:
+            self._pending = None
+            return False
+        self._pending = data
+        return True
+    
+    def retrieve(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """Get the last grabbed frame as a (height, width) uint8 array.
+        
+        Like cv2.VideoCapture.retrieve, the frame is written into image when
+        it has the right shape; otherwise a new array is returned.
+        """
+        if self._pending is None:
+            return False, None
+        frame = np.frombuffer(self._pending, dtype=np.uint8).reshape(self.height, self.width)
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return True, image
+        return True, frame.copy()
+    
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Grab and retrieve the next frame."""
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+    
+    def get(self, prop_id: int) -> float:
+        """Report source stream properties like cv2.VideoCapture.get."""
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self._fps
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self._source_width)
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self._source_height)
+        return 0.0
+    
+    def set(self, prop_id: int, value: float) -> bool:
+        """Properties are fixed by the FFmpeg command line."""
+        return False
+    
+    def release(self) -> None:
+        """Stop the FFmpeg process."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.terminate()
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        finally:
+            if process.stdout:
+                process.stdout.close()
@@ -0,0 +1,39 @@
+"""Single-producer/single-consumer frame ring between capture and detection threads."""
+
+from typing import List, Optional
+
+import numpy as np
+
+
+# Number of decoded frames kept between the capture and detection threads
+FRAME_RING_SIZE = 4
+
+
+class FrameRing:
+    """Fixed ring of reusable frame buffers with a monotonic publish sequence.
+    
+    The capture thread decodes straight into next_slot() and then calls
+    publish(); the detection thread reads seq and latest(). The slot is
+    written before seq is bumped, and seq is a plain int rebind (atomic under
+    the GIL), so no lock is needed with one producer and one consumer.
+    """
+    
+    def __init__(self, size: int = FRAME_RING_SIZE):
+        self._size = size
+        self._slots: List[Optional[np.ndarray]] = [None] * size
+        self.seq = 0
+    
+    def next_slot(self) -> Optional[np.ndarray]:
+        """Get the buffer the next publish will occupy, or None before it is allocated."""
+        return self._slots[self.seq % self._size]
+    
+    def publish(self, frame: np.ndarray) -> None:
+        """Make frame the newest entry, adopting it as the slot buffer if it is new."""
+        self._slots[self.seq % self._size] = frame
+        self.seq += 1
+    
+    def latest(self) -> Optional[np.ndarray]:
+        """Get the most recently published frame."""
+        if self.seq == 0:
+            return None
+        return self._slots[(self.seq - 1) % self._size]
@@ -2,51 +2,205 @@
 
 import cv2
 import numpy as np
-from typing import Tuple
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 
 from src.core.config.settings import app_config
 
 
+# Consecutive no-motion analyses after which the frame skip grows (x4, then x16)
+IDLE_BACKOFF_FRAMES = 50
+DEEP_IDLE_BACKOFF_FRAMES = 500
+
+
+@dataclass(slots=True)
+class CamState:
+    """Per-camera detector state: frame counter, reference frames and work buffers."""
+    frame_count: int = 0
+    # frame_count value at which the next frame is analyzed
+    next_analyze: int = 0
+    last_analyzed: int = -1
+    # Analyzed frames since motion was last seen; drives the idle backoff
+    idle_frames: int = 0
+    previous_gray: Optional[np.ndarray] = None
+    # Per-frame work buffers, (re)allocated when the input frame shape changes
+    buffer_shape: Optional[Tuple[int, ...]] = None
+    small_buf: Optional[np.ndarray] = None
+    gray_bufs: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    gray_index: int = 0
+    diff_buf: Optional[np.ndarray] = None
+    thresh_bufs: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    thresh_index: int = 0
+    mask_buf: Optional[np.ndarray] = None
+    # Thresholded |F(k-1) - F(k-2)| from the previous analyzed frame, and its pixel count
+    previous_thresh: Optional[np.ndarray] = None
+    previous_changed: int = 0
+
+
 class MotionDetectionService:
-    """Simple OpenCV-based motion detection."""
+    """Simple OpenCV-based motion detection.
+    
+    One instance is shared by all cameras; everything that changes per frame
+    lives in a CamState keyed by camera ID. Each camera's state is only
+    touched by that camera's worker thread.
+    """
     
-    def __init__(self, threshold: int = None, min_area: int = None):
+    def __init__(self, threshold: int = None, min_area: int = None, scale: float = None):
         self.threshold = threshold or app_config.motion_detection.threshold
         self.min_area = min_area or app_config.motion_detection.min_area
-        self.frame_count = 0
-        self.previous_gray = None
+        # Frames are diffed at reduced resolution; min_area is given in full-frame pixels
+        self.scale = min(scale or app_config.motion_detection.scale, 1.0)
+        self._scaled_min_area = self.min_area * self.scale * self.scale
         self.skip_frames = app_config.motion_detection.skip_frames
+        self.max_idle_skip_factor = max(1, app_config.motion_detection.max_idle_skip_factor)
+        self.states: Dict[str, CamState] = {}
+    
+    def _allocate_buffers(self, state: CamState, shape: Tuple[int, ...]) -> None:
+        """Preallocate resize/gray/diff/threshold outputs for a frame shape."""
+        height, width = shape[:2]
+        if len(shape) == 2:
+            # Single-channel input arrives already downscaled (FFmpeg reader)
+            small_h, small_w = height, width
+        else:
+            small_h = max(1, round(height * self.scale))
+            small_w = max(1, round(width * self.scale))
+        state.small_buf = np.empty((small_h, small_w, 3), dtype=np.uint8)
+        # Two gray buffers ping-pong between current and previous_gray
+        state.gray_bufs = (np.empty((small_h, small_w), dtype=np.uint8),
+                           np.empty((small_h, small_w), dtype=np.uint8))
+        state.diff_buf = np.empty((small_h, small_w), dtype=np.uint8)
+        # Two threshold buffers ping-pong between current and previous_thresh
+        state.thresh_bufs = (np.empty((small_h, small_w), dtype=np.uint8),
+                             np.empty((small_h, small_w), dtype=np.uint8))
+        state.mask_buf = np.empty((small_h, small_w), dtype=np.uint8)
+        state.buffer_shape = shape
+        state.previous_gray = None
+        state.previous_thresh = None
+        state.previous_changed = 0
+    
+    def _preprocess(self, state: CamState, frame: np.ndarray) -> np.ndarray:
+        """Downscale and convert a BGR frame to grayscale for diffing.
+        
+        Writes into the gray buffer not currently held by previous_gray.
+        Grayscale frames are taken to be downscaled already and only copied.
+        """
+        if frame.shape != state.buffer_shape:
+            self._allocate_buffers(state, frame.shape)
+        
+        state.gray_index ^= 1
+        gray = state.gray_bufs[state.gray_index]
+        if frame.ndim == 2:
+            # Copy out: the caller's frame buffer is reused for later frames
+            np.copyto(gray, frame)
+            return gray
+        
+        if self.scale < 1.0:
+            small = state.small_buf
+            cv2.resize(frame, (small.shape[1], small.shape[0]), dst=small,
+                       interpolation=cv2.INTER_AREA)
+            frame = small
+        
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+    
+    def register(self, camera_id: str, first_frame: np.ndarray) -> None:
+        """Start (or restart) detection for a camera from its first frame."""
+        state = CamState(next_analyze=self.skip_frames)
+        state.previous_gray = self._preprocess(state, first_frame)
+        self.states[camera_id] = state
+    
+    def unregister(self, camera_id: str) -> None:
+        """Drop a camera's state and buffers."""
+        self.states.pop(camera_id, None)
     
-    def initialize_from_frame(self, frame: np.ndarray) -> None:
-        """Initialize motion detection with the first frame."""
-        self.previous_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    def _current_skip(self, state: CamState) -> int:
+        """Get the frame skip for a camera, backed off while it stays idle."""
+        if state.idle_frames < IDLE_BACKOFF_FRAMES:
+            factor = 1
+        elif state.idle_frames < DEEP_IDLE_BACKOFF_FRAMES:
+            factor = 4
+        else:
+            factor = 16
+        return self.skip_frames * min(factor, self.max_idle_skip_factor)
     
-    def detect_motion(self, frame: np.ndarray) -> Tuple[bool, None]:
+    def detect_motion(self, camera_id: str, frame: np.ndarray) -> Tuple[bool, None]:
         """Detect motion in the current frame."""
-        self.frame_count += 1
+        state = self.states[camera_id]
+        state.frame_count += 1
         
         # Skip frames for performance
-        if self.frame_count % self.skip_frames != 0:
+        if state.frame_count < state.next_analyze:
             return False, None
         
-        # Convert to grayscale
-        current_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        motion_detected = self._analyze(state, frame)
+        state.idle_frames = 0 if motion_detected else state.idle_frames + 1
+        state.last_analyzed = state.frame_count
+        if state.previous_changed >= self._scaled_min_area:
+            # Something changed: three-frame differencing needs a second changed
+            # analysis to confirm, so take it at the base rate, not the idle one
+            state.next_analyze = state.frame_count + self.skip_frames
+        else:
+            state.next_analyze = state.frame_count + self._current_skip(state)
+        return motion_detected, None
+    
+    def _analyze(self, state: CamState, frame: np.ndarray) -> bool:
+        """Run the detection pipeline on one frame and update the reference frames."""
+        # Downscale and convert to grayscale (only for frames that are analyzed)
+        current_gray = self._preprocess(state, frame)
+        if state.previous_gray is None:
+            # First frame at this resolution
+            state.previous_gray = current_gray
+            return False
+        
+        # Three-frame differencing: |F(k) - F(k-1)| is thresholded once per frame and
+        # ANDed with the previous frame's |F(k-1) - F(k-2)| mask, so only regions
+        # that changed in both intervals count (global lighting steps drop out)
+        # The diff always runs: a downscaled or cell-averaged pre-check cannot bound
+        # how many pixels exceed the threshold (signed changes cancel), so any early
+        # exit before it could miss small objects
+        diff = cv2.absdiff(state.previous_gray, current_gray, dst=state.diff_buf)
+        state.thresh_index ^= 1
+        thresh = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY,
+                               dst=state.thresh_bufs[state.thresh_index])[1]
+        changed = cv2.countNonZero(thresh)
+        previous_thresh = state.previous_thresh
+        previous_changed = state.previous_changed
         
-        # Calculate difference
-        diff = cv2.absdiff(self.previous_gray, current_gray)
-        thresh = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)[1]
+        # Update previous frame; the mask is kept even when gated below, so the
+        # next frame's AND always sees this interval's real changes
+        state.previous_gray = current_gray
+        state.previous_thresh = thresh
+        state.previous_changed = changed
         
-        # Find contours
-        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if previous_thresh is None:
+            return False
         
-        # Check for motion
-        motion_detected = any(cv2.contourArea(c) >= self.min_area for c in contours)
+        # Cheap gate: the AND is a subset of both masks, so when either interval
+        # changed fewer than min_area pixels no blob can reach min_area
+        if min(changed, previous_changed) < self._scaled_min_area:
+            return False
         
-        # Update previous frame
-        self.previous_gray = current_gray
+        mask = cv2.bitwise_and(previous_thresh, thresh, dst=state.mask_buf)
         
-        return motion_detected, None
+        # Check for motion: no blob can reach min_area if fewer pixels changed in total
+        motion_detected = False
+        if cv2.countNonZero(mask) >= self._scaled_min_area:
+            # Label blobs in one pass; row 0 of stats is the background
+            _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+            areas = stats[1:, cv2.CC_STAT_AREA]
+            motion_detected = areas.size > 0 and int(areas.max()) >= self._scaled_min_area
+        
+        return motion_detected
+    
+    def peek_skip(self, camera_id: str) -> bool:
+        """Check whether the next frame will be skipped, without advancing the count."""
+        state = self.states[camera_id]
+        return state.frame_count + 1 < state.next_analyze
+    
+    def skip_frame(self, camera_id: str) -> None:
+        """Count a frame that the caller chose not to decode."""
+        self.states[camera_id].frame_count += 1
     
-    def should_skip_frame(self) -> bool:
+    def should_skip_frame(self, camera_id: str) -> bool:
         """Check if current frame should be skipped."""
-        return self.frame_count % self.skip_frames != 0
+        state = self.states[camera_id]
+        return state.frame_count != state.last_analyzed
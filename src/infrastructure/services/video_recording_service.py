@@ -1,59 +1,156 @@
 """Video recording service implementation using FFmpeg."""
 
+import itertools
+import os
+import signal
 import subprocess
 import time
 import threading
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Deque, Optional, Dict, Set
 import numpy as np
 
 from src.domain.repositories.video_recording_repository import IVideoRecordingRepository
 from src.core.config.settings import app_config
 from src.core.utils.file_utils import ensure_directory_exists
-from src.core.utils.datetime_utils import utc_now
+
+
+# Number of trailing FFmpeg stderr lines kept per recording for diagnostics
+STDERR_TAIL_LINES = 256
+
+# Number of those lines printed when a stopped FFmpeg had reported errors
+STDERR_REPORT_LINES = 20
+
+# Seconds FFmpeg gets to finalize its segment after SIGINT before it is killed
+STOP_GRACE_SECONDS = 15
+
+# Simple FFmpeg command for video+audio recording; input/output slots are filled per call
+_FFMPEG_CMD_TEMPLATE = (
+    'ffmpeg',
+    '-hide_banner',
+    '-loglevel', 'error',  # Only errors reach the stderr drain
+    '-nostdin',  # Never poll the terminal for input
+    '-rtsp_transport', 'tcp',
+    # Stream copy only needs codec parameters, so probe 1s/1MB instead of the 5s default
+    '-probesize', '1000000',
+    '-analyzeduration', '1000000',
+    '-i', None,  # rtsp_url
+    '-c:v', 'copy',  # Copy video stream (no re-encoding)
+    '-c:a', 'copy',  # Copy audio stream (no re-encoding)
+    '-f', 'segment',  # Use segment muxer for chunks
+    '-segment_time', '3600',  # 60 minutes = 3600 seconds
+    '-segment_format', 'mp4',
+    # Fragmented MP4: moov is written up front and media lands in keyframe fragments,
+    # so a segment stays playable even if FFmpeg is killed before it finalizes
+    '-segment_format_options', 'movflags=+empty_moov+default_base_moof+frag_keyframe',
+    '-reset_timestamps', '1',
+    '-strftime', '1',  # FFmpeg stamps each segment's filename when it opens it
+    None  # output pattern
+)
+_FFMPEG_ENV = {**os.environ, 'TZ': 'UTC'}
+_FFMPEG_INPUT_SLOT = _FFMPEG_CMD_TEMPLATE.index('-i') + 1
+_FFMPEG_OUTPUT_SLOT = len(_FFMPEG_CMD_TEMPLATE) - 1
+
+
+def _parse_cpu_list(spec: str) -> Set[int]:
+    """Parse a taskset-style CPU list ("4-7", "0,2,5-6") into a set of CPU numbers."""
+    cpus: Set[int] = set()
+    for part in spec.replace(' ', '').split(','):
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _ffmpeg_cpu_set() -> Optional[Set[int]]:
+    """Get the CPUs recording FFmpeg processes may run on, or None to leave them alone.
+    
+    Defaults to the main thread's affinity, so FFmpeg does not inherit the
+    single-core pin of the camera thread that starts it.
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return None
+    try:
+        if app_config.recording.ffmpeg_cpus:
+            return _parse_cpu_list(app_config.recording.ffmpeg_cpus)
+        return os.sched_getaffinity(os.getpid())
+    except (ValueError, OSError) as e:
+        print(f"Ignoring FFMPEG_CPUS={app_config.recording.ffmpeg_cpus!r}: {e}")
+        return None
+
+
+@dataclass(slots=True)
+class _RecSlot:
+    """One running recording; fields are never reassigned after creation."""
+    process: subprocess.Popen
+    drain_thread: threading.Thread
+    stderr_tail: Deque[str]
 
 
 class VideoRecordingService(IVideoRecordingRepository):
-    """Simple FFmpeg-based video recording with 60-minute chunks."""
+    """Simple FFmpeg-based video recording with 60-minute chunks.
+    
+    _recordings is copy-on-write: start/stop rebind a new dict under _lock,
+    so status reads take the current dict without locking.
+    """
     
     def __init__(self):
-        self._recording_processes: Dict[str, subprocess.Popen] = {}
+        self._recordings: Dict[str, _RecSlot] = {}
         self._lock = threading.Lock()
+        self._reapers: Set[threading.Thread] = set()
+        # Numbers each FFmpeg launch, so a restart never reuses a finalizing process's filenames
+        self._launch_seq = itertools.count(1)
+        self._recordings_root = Path(app_config.recording.recordings_dir)
+        self._ffmpeg_cpus = _ffmpeg_cpu_set()
     
     def start_recording(self, camera_id: str, rtsp_url: str) -> bool:
         """Start recording video+audio with 60-minute chunks."""
         with self._lock:
-            if camera_id in self._recording_processes:
+            if camera_id in self._recordings:
                 return False  # Already recording
             
             try:
-                # Generate output filename pattern for 60-minute chunks
-                timestamp = utc_now().strftime("%H%M%S")
-                date_str = utc_now().strftime("%Y-%m-%d")
-                recordings_dir = Path(app_config.recording.recordings_dir) / camera_id / date_str
+                # Cleanup prunes empty directories, so make sure the camera's still exists
+                recordings_dir = self._recordings_root / camera_id
                 ensure_directory_exists(str(recordings_dir))
                 
-                output_pattern = recordings_dir / f"{camera_id}_{timestamp}_chunk%03d.mp4"
+                # Segment filenames are formatted by FFmpeg (-strftime 1) in UTC. The
+                # timestamp only has second granularity and a stopped FFmpeg may still be
+                # finalizing its last segment, so the launch number keeps names unique
+                output_pattern = recordings_dir / f"{camera_id}_%Y-%m-%d_%H%M%S_{next(self._launch_seq)}.mp4"
                 
-                # Simple FFmpeg command for video+audio recording
-                ffmpeg_cmd = [
-                    'ffmpeg',
-                    '-y',  # Overwrite output file
-                    '-rtsp_transport', 'tcp',
-                    '-i', rtsp_url,
-                    '-c:v', 'copy',  # Copy video stream (no re-encoding)
-                    '-c:a', 'copy',  # Copy audio stream (no re-encoding)
-                    '-f', 'segment',  # Use segment muxer for chunks
-                    '-segment_time', '3600',  # 60 minutes = 3600 seconds
-                    '-segment_format', 'mp4',
-                    '-reset_timestamps', '1',
-                    str(output_pattern)
-                ]
+                ffmpeg_cmd = list(_FFMPEG_CMD_TEMPLATE)
+                ffmpeg_cmd[_FFMPEG_INPUT_SLOT] = rtsp_url
+                ffmpeg_cmd[_FFMPEG_OUTPUT_SLOT] = str(output_pattern)
                 
                 print(f"Starting recording for {camera_id}...")
-                process = subprocess.Popen(ffmpeg_cmd, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
+                # stdout carries nothing; stderr is drained so FFmpeg never blocks on a full pipe.
+                # Own session: a terminal Ctrl+C must not reach FFmpeg ahead of stop_recording
+                process = subprocess.Popen(ffmpeg_cmd, stderr=subprocess.PIPE,
+                                           stdout=subprocess.DEVNULL, bufsize=1 << 20,
+                                           env=_FFMPEG_ENV, start_new_session=True)
+                if self._ffmpeg_cpus:
+                    try:
+                        os.sched_setaffinity(process.pid, self._ffmpeg_cpus)
+                    except OSError as e:
+                        print(f"Could not set FFmpeg CPU affinity for {camera_id}: {e}")
                 
-                self._recording_processes[camera_id] = process
+                tail: Deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+                drain_thread = threading.Thread(
+                    target=self._drain_stderr,
+                    args=(process, tail),
+                    name=f"FFmpegLog-{camera_id}",
+                    daemon=True
+                )
+                drain_thread.start()
+                self._recordings = {**self._recordings, camera_id: _RecSlot(
+                    process=process,
+                    drain_thread=drain_thread,
+                    stderr_tail=tail
+                )}
                 return True
                 
             except Exception as e:
@@ -61,31 +158,81 @@ class VideoRecordingService(IVideoRecordingRepository):
                 return False
     
     def stop_recording(self, camera_id: str) -> bool:
-        """Stop recording for the specified camera."""
+        """Stop recording for the specified camera.
+        
+        FFmpeg is sent SIGINT so it flushes the last fragment of the current
+        MP4 segment; the wait happens on a reaper thread, so this returns
+        immediately and is_recording reports False right away.
+        """
         with self._lock:
-            process = self._recording_processes.get(camera_id)
-            if not process:
+            slot = self._recordings.get(camera_id)
+            if not slot:
                 return False
             
+            recordings = dict(self._recordings)
+            del recordings[camera_id]
+            self._recordings = recordings
+            
             try:
-                process.terminate()
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                process.wait()
-            except Exception as e:
+                slot.process.send_signal(signal.SIGINT)
+            except OSError as e:
                 print(f"Error stopping recording for {camera_id}: {e}")
-                return False
-            finally:
-                self._recording_processes.pop(camera_id, None)
-                
+            
+            reaper = threading.Thread(
+                target=self._reap,
+                args=(camera_id, slot),
+                name=f"FFmpegReap-{camera_id}",
+                daemon=True
+            )
+            self._reapers.add(reaper)
+            reaper.start()
             return True
     
+    def _reap(self, camera_id: str, slot: _RecSlot) -> None:
+        """Wait for a stopping FFmpeg process, killing it only after STOP_GRACE_SECONDS.
+        
+        FFmpeg runs with -loglevel error, so anything left in its stderr tail
+        is an error and is printed once the process is gone.
+        """
+        try:
+            slot.process.wait(timeout=STOP_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            print(f"FFmpeg for {camera_id} did not exit after SIGINT, killing it")
+            slot.process.kill()
+            slot.process.wait()
+        finally:
+            slot.drain_thread.join(timeout=1)
+            if slot.stderr_tail:
+                errors = list(slot.stderr_tail)[-STDERR_REPORT_LINES:]
+                print(f"FFmpeg for {camera_id} reported errors:\n" + "\n".join(errors))
+            self._reapers.discard(threading.current_thread())
+    
+    def wait_for_stopped(self, timeout: float = STOP_GRACE_SECONDS) -> None:
+        """Wait for recordings that are still finalizing after stop_recording."""
+        deadline = time.monotonic() + timeout
+        for reaper in list(self._reapers):
+            reaper.join(timeout=max(0, deadline - time.monotonic()))
+    
     def is_recording(self, camera_id: str) -> bool:
         """Check if recording is active for the camera."""
-        with self._lock:
-            process = self._recording_processes.get(camera_id)
-            return process is not None and process.poll() is None
+        slot = self._recordings.get(camera_id)
+        return slot is not None and slot.process.poll() is None
+    
+    @staticmethod
+    def _drain_stderr(process: subprocess.Popen, tail: Deque[str]) -> None:
+        """Read FFmpeg stderr until EOF, keeping only the last lines."""
+        try:
+            for line in iter(process.stderr.readline, b''):
+                tail.append(line.decode('utf-8', 'replace').rstrip())
+        except (OSError, ValueError):
+            pass  # Pipe closed underneath us
+        finally:
+            process.stderr.close()
+    
+    def get_recording_ids(self) -> Set[str]:
+        """Get the IDs of all cameras with a live FFmpeg process."""
+        return {camera_id for camera_id, slot in self._recordings.items()
+                if slot.process.poll() is None}
     
     def write_frame(self, camera_id: str, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
         """Not used - FFmpeg handles frames directly from RTSP."""
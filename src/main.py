@@ -7,7 +7,8 @@ import signal
 import sys
 import os
 import logging
-from http.server import HTTPServer
+import threading
+from http.server import ThreadingHTTPServer
 
 from .di import initialize_container
 from .core.config.settings import get_settings
@@ -35,18 +36,11 @@ def signal_handler(signum, frame):
     print("\nShutting down system...")
     
     try:
-        # Stop HTTP server first to break out of serve_forever()
+        # Stop HTTP server first; serve_forever() runs on its own thread, so this
+        # returns as soon as the serving loop notices
         if http_server:
             print("Stopping HTTP server...")
-            # Use threading to shutdown from a different thread
-            import threading
-            def shutdown_http():
-                http_server.shutdown()
-            
-            shutdown_thread = threading.Thread(target=shutdown_http)
-            shutdown_thread.daemon = True
-            shutdown_thread.start()
-            shutdown_thread.join(timeout=2)
+            http_server.shutdown()
         
         # Shutdown dependency container (which stops all services)
         if container:
@@ -103,7 +97,9 @@ def run_motion_detection_server():
         # Create HTTP server with clean architecture controller
         print("Starting HTTP API server...")
         camera_controller_class = container.get_camera_controller_class()
-        http_server = HTTPServer((settings.http.host, settings.http.port), camera_controller_class)
+        # One thread per request, so a slow addCamera/deleteCamera never blocks /status polls
+        http_server = ThreadingHTTPServer((settings.http.host, settings.http.port), camera_controller_class)
+        http_server.daemon_threads = True  # Do not hold up shutdown on in-flight requests
         
         print(f"Motion Detection API server starting on http://{settings.http.host}:{settings.http.port}")
         print("Available endpoints:")
@@ -113,8 +109,12 @@ def run_motion_detection_server():
         print(f"WebSocket server available at ws://{settings.websocket.host}:{settings.websocket.port}")
         print("\nPress Ctrl+C to stop the server")
         
-        # Start serving HTTP requests
-        http_server.serve_forever()
+        # Serve on a separate thread so the signal handler (which always runs on the
+        # main thread) can call shutdown() directly without deadlocking serve_forever()
+        serve_thread = threading.Thread(target=http_server.serve_forever,
+                                        name="HTTPServer", daemon=True)
+        serve_thread.start()
+        serve_thread.join()
         
     except ApplicationStartupError as e:
         logger.error(f"Application startup failed: {e}")